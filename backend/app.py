@@ -1,22 +1,86 @@
 import sys
 import os
+import time
+import click
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 from flask_cors import CORS
+from sqlalchemy import inspect
 
 from routers.cliente_router import cliente_bp
+from routers.metrics_router import metrics_bp
+from services.hash_service import servico_hash
+from services.compression_service import comprimir_resposta, TAMANHO_MINIMO
+from database.models import criar_tabelas
+from database.conn import get_engine
+from database.migrations import aplicar_migracoes, MigracaoError
 
-app = Flask(__name__, 
-            static_folder='static',
-            static_url_path='/static')
-CORS(app)
 
-app.register_blueprint(cliente_bp)
+def create_app(config=None):
+    """
+    Monta a aplicação Flask
+    Args:
+        config: dict opcional de configurações (sobrepõe os padrões)
+    Nenhuma conexão é aberta aqui, então o app pode ser pré-carregado antes do fork
+    dos workers (ver gunicorn.conf.py).
+    """
+    inicio = time.perf_counter()
+    
+    app = Flask(__name__, 
+                static_folder='static',
+                static_url_path='/static')
+    app.config['HASH_CALIBRAR'] = os.getenv('HASH_CALIBRAR', '').lower() in ('1', 'true')
+    app.config['SERVER_TIMING'] = os.getenv('SERVER_TIMING', '').lower() in ('1', 'true')
+    app.config['COMPRESSAO_MINIMO'] = TAMANHO_MINIMO
+    if config:
+        app.config.from_mapping(config)
+    CORS(app)
+    
+    app.register_blueprint(cliente_bp)
+    app.register_blueprint(metrics_bp)
+    
+    @app.after_request
+    def comprimir(resposta):
+        # COMPRESSAO_MINIMO=0 desliga a compressão
+        if not app.config['COMPRESSAO_MINIMO']:
+            return resposta
+        return comprimir_resposta(resposta, request.accept_encodings, app.config['COMPRESSAO_MINIMO'])
+    
+    @app.route('/')
+    def index():
+        return render_template('index.html')
+    
+    @app.cli.command('init-db')
+    def init_db():
+        """Cria as tabelas de um banco novo (flask --app app init-db)"""
+        # Num banco existente, create_all criaria tabelas auxiliares vazias sem a carga inicial
+        if inspect(get_engine()).has_table('clientes'):
+            raise click.ClickException(
+                'O banco já tem a tabela clientes; use "flask --app app migrate" para atualizá-lo.'
+            )
+        criar_tabelas()
+        print("Tabelas criadas!")
+    
+    @app.cli.command('migrate')
+    def migrate():
+        """Atualiza um banco existente para o esquema atual (flask --app app migrate)"""
+        try:
+            for nome in aplicar_migracoes():
+                print(f"Migração aplicada: {nome}")
+        except MigracaoError as e:
+            raise click.ClickException(str(e))
+    
+    # Mede o custo do bcrypt neste host (HASH_CALIBRAR=1)
+    if app.config['HASH_CALIBRAR']:
+        print(f"Calibração do bcrypt: {servico_hash.calibrar()}")
+    
+    # Tempo de montagem da aplicação, sem acesso ao banco
+    app.config['TEMPO_INICIALIZACAO_MS'] = round((time.perf_counter() - inicio) * 1000, 1)
+    return app
 
-@app.route('/')
-def index():
-    return render_template('index.html')
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app = create_app()
+    print(f"Aplicação montada em {app.config['TEMPO_INICIALIZACAO_MS']} ms")
+    app.run(debug=True, port=5000)
@@ -0,0 +1,42 @@
+"""
+Modo assíncrono opcional (ASGI), sobre Quart e o engine assíncrono do SQLAlchemy.
+
+Dependências extras: pip install -r requirements-async.txt
+Execução: hypercorn "app_async:create_async_app()" --bind 0.0.0.0:5000
+
+Banco: ASYNC_DATABASE_URL (ex.: sqlite+aiosqlite:///clientes.db) ou, sem ela,
+DATABASE_URL/DB_* com o driver assíncrono (aiomysql ou aiosqlite).
+Exportação em streaming e cadastro em lote continuam disponíveis só no app síncrono.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from quart import Quart, render_template
+
+from routers.cliente_router_async import cliente_bp_async
+from database.async_conn import dispose_async_engine
+from services.hash_service import servico_hash
+
+
+def create_async_app():
+    app = Quart(__name__,
+                static_folder='static',
+                static_url_path='/static')
+    
+    app.register_blueprint(cliente_bp_async)
+    
+    @app.route('/')
+    async def index():
+        return await render_template('index.html')
+    
+    @app.after_serving
+    async def encerrar_engine():
+        await dispose_async_engine()
+        servico_hash.encerrar()
+    
+    return app
+
+
+if __name__ == '__main__':
+    create_async_app().run(port=5000)
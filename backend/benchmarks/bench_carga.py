@@ -0,0 +1,298 @@
+"""
+Benchmark de carga e micro-benchmarks do cliente_bp sobre um SQLite local.
+
+Popula um banco com clientes sintéticos (CPFs válidos, emails únicos), sobe o app
+em um servidor HTTP local com threads e dispara requisições concorrentes contra
+cada endpoint, medindo vazão e latência p50/p95/p99. Em seguida mede os caminhos
+de DTO, formatação e hashing isoladamente.
+
+Uso:
+    python benchmarks/bench_carga.py --clientes 10000 --concorrencia 16 --requisicoes 500
+    python benchmarks/bench_carga.py --clientes 100000 --comparar benchmarks/resultados/anterior.json
+
+Os resultados são gravados em benchmarks/resultados/<data-hora>.json (ou --saida).
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE)
+
+NOMES = ['Ana', 'João', 'Maria', 'José', 'Francisco', 'Antônia', 'Carlos', 'Paula',
+         'Luiz', 'Fernanda', 'Marcos', 'Juliana', 'Pedro', 'Conceição', 'Rafael', 'Letícia']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves',
+              'Pereira', 'Lima', 'Gomes', 'Ribeiro', 'Carvalho', 'Araújo', 'Melo', 'Barbosa']
+
+
+def gerar_cpf(numero):
+    """CPF válido (com dígitos verificadores) derivado de um número sequencial"""
+    base = [int(d) for d in f'{numero % 10 ** 9:09d}']
+    for tamanho in (9, 10):
+        soma = sum(d * peso for d, peso in zip(base, range(tamanho + 1, 1, -1)))
+        resto = soma * 10 % 11
+        base.append(0 if resto == 10 else resto)
+    return ''.join(map(str, base))
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=10000, help='clientes sintéticos (1k a 1M)')
+    parser.add_argument('--concorrencia', type=int, default=16, help='clientes HTTP simultâneos')
+    parser.add_argument('--requisicoes', type=int, default=500, help='requisições por endpoint')
+    parser.add_argument('--banco', help='arquivo SQLite (padrão: temporário)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4, help='custo do bcrypt durante a carga')
+    parser.add_argument('--saida', help='arquivo JSON de resultados')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para comparação')
+    parser.add_argument('--sem-carga', action='store_true', help='roda só os micro-benchmarks')
+    return parser.parse_args()
+
+
+def popular(engine, quantidade, senha_hash):
+    """Insere clientes, termos de nome e totais diários em lotes"""
+    from sqlalchemy import insert, text
+    from models.cliente import Cliente, ClienteTermo
+
+    inicio = datetime(2020, 1, 1)
+    lote = 5000
+    with engine.begin() as conn:
+        for primeiro in range(1, quantidade + 1, lote):
+            clientes, termos = [], []
+            for i in range(primeiro, min(primeiro + lote, quantidade + 1)):
+                nome = f'{random.choice(NOMES)} {random.choice(SOBRENOMES)} {random.choice(SOBRENOMES)}'
+                cpf = gerar_cpf(i)
+                cadastro = inicio + timedelta(seconds=random.randint(0, 5 * 365 * 86400))
+                clientes.append({
+                    'id': i,
+                    'nome': nome,
+                    'email': f'cliente{i}@exemplo.com',
+                    'email_normalizado': f'cliente{i}@exemplo.com',
+                    'telefone': Cliente.formatar_telefone(f'119{i % 10 ** 8:08d}'),
+                    'cpf': Cliente.formatar_cpf(cpf),
+                    'cpf_normalizado': cpf,
+                    'data_nascimento': date(1950, 1, 1) + timedelta(days=random.randint(0, 20000)),
+                    'senha_hash': senha_hash,
+                    'data_cadastro': cadastro,
+                    'data_atualizacao': cadastro
+                })
+                termos.extend({'termo': termo, 'cliente_id': i} for termo in Cliente.tokenizar_nome(nome))
+            conn.execute(insert(Cliente), clientes)
+            conn.execute(insert(ClienteTermo), termos)
+        conn.execute(text(
+            'INSERT INTO clientes_cadastros_diarios (dia, total) '
+            'SELECT DATE(data_cadastro), COUNT(*) FROM clientes GROUP BY DATE(data_cadastro)'
+        ))
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def requisitar(base_url, metodo, caminho, corpo=None, formulario=None):
+    dados, cabecalhos = None, {}
+    if corpo is not None:
+        dados = json.dumps(corpo).encode('utf-8')
+        cabecalhos['Content-Type'] = 'application/json'
+    elif formulario is not None:
+        dados = urllib.parse.urlencode(formulario).encode('utf-8')
+        cabecalhos['Content-Type'] = 'application/x-www-form-urlencoded'
+    pedido = urllib.request.Request(base_url + caminho, data=dados, method=metodo, headers=cabecalhos)
+    try:
+        with urllib.request.urlopen(pedido, timeout=60) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def disparar(base_url, gerador, quantidade, concorrencia, esperado=200):
+    """
+    Executa `quantidade` requisições geradas por gerador(i) com `concorrencia` threads
+    Qualquer status diferente de `esperado` conta como erro e fica fora do req/s.
+    """
+    latencias = []
+    erros = 0
+    lock = threading.Lock()
+
+    def executar(i):
+        nonlocal erros
+        metodo, caminho, kwargs = gerador(i)
+        inicio = time.perf_counter()
+        status = requisitar(base_url, metodo, caminho, **kwargs)
+        decorrido = time.perf_counter() - inicio
+        with lock:
+            latencias.append(decorrido)
+            if status != esperado:
+                erros += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(executar, range(quantidade)))
+    total = time.perf_counter() - inicio
+
+    return {
+        'requisicoes': quantidade,
+        'erros': erros,
+        'req_por_segundo': round((quantidade - erros) / total, 1),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+        'p95_ms': round(percentil(latencias, 95) * 1000, 2),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 2)
+    }
+
+
+def carga(args):
+    from werkzeug.serving import make_server
+    from database.conn import criar_engine, definir_engine
+    from models.cliente import Base
+    from services.hash_service import servico_hash
+    from app import create_app
+
+    caminho = args.banco or os.path.join(tempfile.mkdtemp(), 'bench.db')
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    # Mesmo engine que DATABASE_URL=sqlite:///... produz (WAL e pragmas)
+    engine = criar_engine(f'sqlite:///{caminho}')
+
+    definir_engine(engine)
+    Base.metadata.create_all(engine)
+
+    inicio = time.perf_counter()
+    popular(engine, args.clientes, servico_hash.gerar_hash('senha123'))
+    print(f'{args.clientes} clientes inseridos em {time.perf_counter() - inicio:.1f} s ({caminho})')
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    servidor = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{servidor.server_port}/api/clientes'
+
+    n = args.clientes
+    novos = args.clientes + 1
+    cenarios = [
+        ('POST /api/clientes', 201, lambda i: ('POST', '', {'formulario': {
+            'email': f'novo{i}@exemplo.com', 'name': f'{random.choice(NOMES)} {random.choice(SOBRENOMES)}',
+            'number': '11987654321', 'cpf': gerar_cpf(novos + i), 'data': '1990-05-17',
+            'password': 'senha123', 'password_c': 'senha123'
+        }})),
+        ('GET /api/clientes', 200, lambda i: ('GET', '?limit=50', {})),
+        ('GET /api/clientes (fields)', 200, lambda i: ('GET', '?limit=50&fields=id,nome', {})),
+        ('GET /api/clientes/<id>', 200, lambda i: ('GET', f'/{random.randint(1, n)}', {})),
+        ('GET /api/clientes/search', 200, lambda i: ('GET', f'/search?q={urllib.parse.quote(random.choice(SOBRENOMES)[:3])}', {})),
+        ('GET /api/clientes/stats (período)', 200, lambda i: ('GET', '/stats?start=2021-01-01&end=2021-12-31&group=month', {})),
+        ('PUT /api/clientes/<id>', 200, lambda i: ('PUT', f'/{random.randint(1, n)}', {'corpo': {
+            'nome': f'{random.choice(NOMES)} {random.choice(SOBRENOMES)}'
+        }})),
+        ('DELETE /api/clientes/<id>', 200, lambda i: ('DELETE', f'/{n - i}', {})),
+    ]
+
+    resultados = {}
+    try:
+        for nome, esperado, gerador in cenarios:
+            resultados[nome] = disparar(base_url, gerador, min(args.requisicoes, n), args.concorrencia, esperado)
+            r = resultados[nome]
+            print(f'  {nome:<36} {r["req_por_segundo"]:>9} req/s  p50 {r["p50_ms"]:>8} ms  '
+                  f'p95 {r["p95_ms"]:>8} ms  p99 {r["p99_ms"]:>8} ms  erros {r["erros"]}')
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+def micro():
+    from models.cliente import Cliente
+    from dtos.cliente_dto import ClienteResponseDTO, CAMPOS_RESPOSTA, serializar_linhas
+    from services.hash_service import servico_hash
+
+    agora = datetime.now().replace(microsecond=0)
+    cliente = Cliente(
+        id=1, nome='Maria Conceição Souza', email='maria@exemplo.com', telefone='(11) 98765-4321',
+        cpf='529.982.247-25', data_nascimento=date(1990, 5, 17), senha_hash='x',
+        data_cadastro=agora, data_atualizacao=agora
+    )
+    linhas = [tuple(getattr(cliente, campo) for campo in CAMPOS_RESPOSTA)] * 1000
+
+    casos = {
+        'ClienteResponseDTO.to_dict': (lambda: ClienteResponseDTO(cliente).to_dict(), 1),
+        'serializar_linhas (por linha)': (lambda: serializar_linhas(linhas), len(linhas)),
+        'formatar_cpf': (lambda: Cliente.formatar_cpf('52998224725'), 1),
+        'formatar_telefone': (lambda: Cliente.formatar_telefone('11987654321'), 1),
+        'tokenizar_nome': (lambda: Cliente.tokenizar_nome(cliente.nome), 1),
+    }
+    resultados = {}
+    for nome, (funcao, itens) in casos.items():
+        repeticoes, total = timeit.Timer(funcao).autorange()
+        resultados[nome] = {'us_por_item': round(total / repeticoes / itens * 1e6, 3)}
+
+    inicio = time.perf_counter()
+    amostras = 5
+    for _ in range(amostras):
+        servico_hash.gerar_hash('senha123')
+    resultados[f'bcrypt (custo {servico_hash.custo})'] = {
+        'us_por_item': round((time.perf_counter() - inicio) / amostras * 1e6, 1)
+    }
+
+    for nome, r in resultados.items():
+        print(f'  {nome:<36} {r["us_por_item"]:>12} us')
+    return resultados
+
+
+def comparar(atual, anterior):
+    """Imprime a variação percentual de cada métrica em relação à execução anterior"""
+    for secao in ('carga', 'micro'):
+        for nome, metricas in atual.get(secao, {}).items():
+            base = anterior.get(secao, {}).get(nome)
+            if not base:
+                continue
+            partes = []
+            for metrica in ('req_por_segundo', 'p95_ms', 'us_por_item'):
+                if metrica in metricas and base.get(metrica):
+                    variacao = (metricas[metrica] - base[metrica]) / base[metrica] * 100
+                    partes.append(f'{metrica} {variacao:+.1f}%')
+            if partes:
+                print(f'  {nome:<36} ' + '  '.join(partes))
+
+
+def main():
+    args = argumentos()
+    os.environ['BCRYPT_ROUNDS'] = str(args.bcrypt_rounds)
+
+    resultado = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'parametros': vars(args),
+    }
+    if not args.sem_carga:
+        print('Carga:')
+        resultado['carga'] = carga(args)
+    print('Micro-benchmarks:')
+    resultado['micro'] = micro()
+
+    saida = args.saida or os.path.join(
+        BASE, 'benchmarks', 'resultados', datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+    )
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f'Resultados gravados em {saida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            print(f'Comparação com {args.comparar}:')
+            comparar(resultado, json.load(arquivo))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Compara o custo por linha das respostas de lista:
+  - caminho DTO: objetos Cliente do ORM -> ClienteResponseDTO.to_dict()
+  - caminho rápido: colunas como linhas -> serializar_linhas()
+
+Uso: python benchmarks/bench_serializacao.py [--linhas 100000] [--repeticoes 3]
+Roda sobre um SQLite em memória, sem depender do banco configurado.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from models.cliente import Cliente, Base
+from dtos.cliente_dto import ClienteResponseDTO, CAMPOS_RESPOSTA, serializar_linhas
+
+
+def popular(engine, quantidade):
+    inicio = datetime(2020, 1, 1)
+    linhas = []
+    for i in range(1, quantidade + 1):
+        cpf = f'{i:011d}'
+        cadastro = inicio + timedelta(seconds=random.randint(0, 5 * 365 * 86400))
+        linhas.append({
+            'id': i,
+            'nome': f'Cliente {i}',
+            'email': f'cliente{i}@exemplo.com',
+            'email_normalizado': f'cliente{i}@exemplo.com',
+            'telefone': '(11) 98765-4321',
+            'cpf': Cliente.formatar_cpf(cpf),
+            'cpf_normalizado': cpf,
+            'data_nascimento': date(1950, 1, 1) + timedelta(days=random.randint(0, 20000)),
+            'senha_hash': 'x' * 60,
+            'data_cadastro': cadastro,
+            'data_atualizacao': cadastro
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(Cliente), linhas)
+
+
+def medir(funcao, repeticoes):
+    """Melhor tempo (s) entre as repetições, e o resultado da última"""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    popular(engine, args.linhas)
+    colunas = [getattr(Cliente, campo) for campo in CAMPOS_RESPOSTA]
+
+    with Session(engine) as session:
+        def caminho_dto():
+            session.expunge_all()
+            return [ClienteResponseDTO(cliente).to_dict() for cliente in session.query(Cliente).all()]
+
+        def caminho_rapido():
+            return serializar_linhas(session.query(*colunas).all(), CAMPOS_RESPOSTA)
+
+        clientes = session.query(Cliente).all()
+        linhas = session.query(*colunas).all()
+        casos = [
+            ('DTO (consulta + serialização)', caminho_dto),
+            ('rápido (consulta + serialização)', caminho_rapido),
+            ('DTO (só serialização)', lambda: [ClienteResponseDTO(c).to_dict() for c in clientes]),
+            ('rápido (só serialização)', lambda: serializar_linhas(linhas, CAMPOS_RESPOSTA)),
+        ]
+
+        print(f'{args.linhas} linhas, melhor de {args.repeticoes}')
+        resultados = {}
+        for nome, funcao in casos:
+            segundos, dados = medir(funcao, args.repeticoes)
+            resultados[nome] = dados
+            print(f'  {nome:<34} {segundos * 1000:9.1f} ms  {segundos / args.linhas * 1e6:6.2f} us/linha')
+
+        segundos, _ = medir(lambda: json.dumps(resultados['rápido (só serialização)']), args.repeticoes)
+        print(f'  {"json.dumps da lista":<34} {segundos * 1000:9.1f} ms  {segundos / args.linhas * 1e6:6.2f} us/linha')
+
+        assert resultados['DTO (só serialização)'] == resultados['rápido (só serialização)']
+
+
+if __name__ == '__main__':
+    main()
@@ -1,43 +1,151 @@
 # controllers/cliente_controller.py
-from models.cliente import Cliente
+from models.cliente import Cliente, ClienteTermo, ClienteCadastroDiario, ClienteExclusao, ClienteSequencia
 from database.models import DatabaseManager
-from dtos.cliente_dto import ClienteResponseDTO
+from dtos.cliente_dto import (
+    RegistrarClienteDTO, AtualizarClienteDTO, ClienteResponseDTO, CAMPOS_RESPOSTA,
+    serializar_linhas, validar_lote
+)
+from services.hash_service import servico_hash, ServicoSaturadoError
+from services.cache_service import cache_clientes
+from sqlalchemy import and_, or_, select, insert, update, delete, case, func, extract
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime
-import bcrypt
+import base64
+import csv
+import io
+import json
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+ORDENACOES = ('id', 'data_cadastro')
+FORMATOS_EXPORTACAO = ('ndjson', 'csv')
+LOTE_EXPORTACAO = 1000
+LOTE_CADASTRO = 500
+LIMITE_CADASTRO_LOTE = 50000
+LIMITE_BUSCA_PADRAO = 20
+LIMITE_BUSCA_MAXIMO = 100
+LIMITE_ATUALIZACAO_LOTE = 1000
+LIMITE_BUSCA_LOTE = 1000
+LOTE_CONSULTA_IN = 500
+LIMITE_FEED_PADRAO = 500
+LIMITE_FEED_MAXIMO = 5000
+
+
+def codificar_cursor(dados):
+    """Codifica a posição da última linha da página em um cursor opaco"""
+    texto = json.dumps(dados, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Decodifica um cursor gerado por codificar_cursor"""
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido!')
+
+
+def chave_cache(id=None, email=None, cpf=None):
+    """Chave do cache para a busca por id, email ou CPF (email e CPF normalizados)"""
+    if id:
+        return f'cliente:id:{id}'
+    if email:
+        return f'cliente:email:{Cliente.normalizar_email(email)}'
+    if cpf:
+        return f'cliente:cpf:{Cliente.normalizar_cpf(cpf)}'
+    return None
+
+
+def chaves_cache(cliente):
+    """Todas as chaves de cache sob as quais um cliente pode estar armazenado"""
+    return [
+        chave_cache(id=cliente.id),
+        chave_cache(email=cliente.email),
+        chave_cache(cpf=cliente.cpf)
+    ]
+
+
+def validar_campos(campos):
+    """Valida a projeção pedida e retorna a lista de campos (todos se vazia)"""
+    campos = list(campos) if campos else list(CAMPOS_RESPOSTA)
+    invalidos = [campo for campo in campos if campo not in CAMPOS_RESPOSTA]
+    if invalidos:
+        raise ValueError(f'Campos inválidos: {", ".join(invalidos)}!')
+    return campos
+
 
 class ClienteController:
-    def __init__(self):
+    def __init__(self, session=None):
+        """
+        session: sessão fixa a usar (ex.: a fachada síncrona de uma AsyncSession);
+        se None, usa a sessão da requisição atual do DatabaseManager
+        """
         self.db = DatabaseManager()
-        self.session = self.db.get_session()
+        self._session = session
+    
+    @property
+    def session(self):
+        """Sessão da requisição atual; o controller é compartilhado entre threads"""
+        if self._session is not None:
+            return self._session
+        return self.db.get_session()
+    
+    @property
+    def session_leitura(self):
+        """
+        Sessão para os métodos somente leitura: uma réplica, se configurada;
+        depois de uma escrita na mesma requisição, a sessão primária
+        """
+        if self._session is not None:
+            return self._session
+        return self.db.get_session_leitura()
+    
+    def encerrar_sessao(self):
+        """Descarta a sessão da requisição atual, liberando a conexão e o identity map"""
+        self.db.remove()
+    
+    def verificar_cadastro(self, dados):
+        """
+        Validações do cadastro que consultam o banco (CPF válido, email e CPF livres),
+        feitas antes do bcrypt; retorna a mensagem de erro ou None
+        """
+        if not Cliente.validar_cpf(dados['cpf']):
+            return 'CPF inválido!'
+        
+        # Verifica se email já existe
+        email_normalizado = Cliente.normalizar_email(dados['email'])
+        if self.session.query(Cliente.id).filter_by(email_normalizado=email_normalizado).first():
+            return 'Email já cadastrado!'
+        
+        # Verifica se CPF já existe
+        cpf_normalizado = Cliente.normalizar_cpf(dados['cpf'])
+        if self.session.query(Cliente.id).filter_by(cpf_normalizado=cpf_normalizado).first():
+            return 'CPF já cadastrado!'
+        return None
     
     def cadastrar_cliente(self, dados):
         """
         Cadastra um novo cliente
         dados: dict com email, nome, telefone, cpf, data_nascimento, senha
+               (ou senha_hash já calculado, quando o hash foi feito fora da sessão)
         """
         try:
-            # Validações
-            if not Cliente.validar_cpf(dados['cpf']):
-                return {'success': False, 'message': 'CPF inválido!'}
-            
-            # Verifica se email já existe
-            if self.session.query(Cliente).filter_by(email=dados['email']).first():
-                return {'success': False, 'message': 'Email já cadastrado!'}
-            
-            # Verifica se CPF já existe
-            if self.session.query(Cliente).filter_by(cpf=dados['cpf']).first():
-                return {'success': False, 'message': 'CPF já cadastrado!'}
+            erro = self.verificar_cadastro(dados)
+            if erro:
+                return {'success': False, 'message': erro}
             
             # Criptografa senha
-            senha_hash = bcrypt.hashpw(
-                dados['senha'].encode('utf-8'), 
-                bcrypt.gensalt()
-            )
+            senha_hash = dados.get('senha_hash') or servico_hash.gerar_hash(dados['senha'])
             
             # Formata dados
             telefone_formatado = Cliente.formatar_telefone(dados['telefone'])
             cpf_formatado = Cliente.formatar_cpf(dados['cpf'])
             
+            sequencia = self._registrar_alteracao()
+            
             # Cria novo cliente
             novo_cliente = Cliente(
                 nome=dados['nome'],
@@ -45,11 +153,16 @@ class ClienteController:
                 telefone=telefone_formatado,
                 cpf=cpf_formatado,
                 data_nascimento=datetime.strptime(dados['data_nascimento'], '%Y-%m-%d').date(),
-                senha_hash=senha_hash.decode('utf-8')
+                senha_hash=senha_hash,
+                seq_alteracao=sequencia
             )
             
             self.session.add(novo_cliente)
+            self.session.flush()
+            self._indexar_nomes([(novo_cliente.id, novo_cliente.nome)])
+            self._registrar_cadastros({novo_cliente.data_cadastro.date(): 1})
             self.session.commit()
+            cache_clientes.delete(*chaves_cache(novo_cliente))
             
             # Usa DTO de resposta
             response_dto = ClienteResponseDTO(novo_cliente)
@@ -60,41 +173,367 @@ class ClienteController:
                 'cliente': response_dto.to_dict()
             }
             
+        except ServicoSaturadoError:
+            self.session.rollback()
+            raise
         except Exception as e:
             self.session.rollback()
             return {'success': False, 'message': f'Erro ao cadastrar: {str(e)}'}
     
-    def listar_clientes(self):
-        """Lista todos os clientes"""
+    def cadastrar_clientes_lote(self, registros):
+        """
+        Cadastra vários clientes de uma vez
+        Args:
+            registros: lista de dicts com os mesmos campos do formulário de cadastro
+        Returns:
+            relatório com o resultado de cada registro, na ordem recebida
+        """
+        if len(registros) > LIMITE_CADASTRO_LOTE:
+            return {'success': False, 'message': f'Máximo de {LIMITE_CADASTRO_LOTE} registros por lote!'}
+        
+        resultados = [{'indice': indice, 'success': False} for indice in range(len(registros))]
+        validos = {}
+        emails_vistos = set()
+        cpfs_vistos = set()
+        
+        # Validação de todos os registros antes de qualquer consulta
+        erros_lote = validar_lote(registros)
+        
+        # Unicidade dentro do próprio lote
+        for indice, registro in enumerate(registros):
+            try:
+                if erros_lote[indice]:
+                    resultados[indice]['erros'] = erros_lote[indice]
+                    raise ValueError(next(iter(erros_lote[indice].values())))
+                dto = RegistrarClienteDTO(registro)
+                email_normalizado = Cliente.normalizar_email(dto.email)
+                cpf_normalizado = Cliente.normalizar_cpf(dto.cpf)
+                if email_normalizado in emails_vistos:
+                    raise ValueError('Email repetido no lote!')
+                if cpf_normalizado in cpfs_vistos:
+                    raise ValueError('CPF repetido no lote!')
+                
+                # Insert em lote não passa pelos validadores do modelo
+                dados = {
+                    'nome': dto.nome,
+                    'email': dto.email,
+                    'email_normalizado': email_normalizado,
+                    'telefone': Cliente.formatar_telefone(dto.telefone),
+                    'cpf': Cliente.formatar_cpf(dto.cpf),
+                    'cpf_normalizado': cpf_normalizado,
+                    'data_nascimento': datetime.strptime(dto.data_nascimento, '%Y-%m-%d').date(),
+                    'senha': dto.senha
+                }
+            except (ValueError, AttributeError, TypeError) as e:
+                resultados[indice]['message'] = str(e)
+                continue
+            
+            emails_vistos.add(email_normalizado)
+            cpfs_vistos.add(cpf_normalizado)
+            validos[indice] = dados
+        
         try:
-            clientes = self.session.query(Cliente).all()
-            # Usa DTO de resposta para cada cliente
+            # Unicidade contra o banco com consultas IN por bloco
+            emails_existentes = set()
+            cpfs_existentes = set()
+            emails = [dados['email_normalizado'] for dados in validos.values()]
+            cpfs = [dados['cpf_normalizado'] for dados in validos.values()]
+            for inicio in range(0, len(emails), LOTE_CADASTRO):
+                emails_existentes.update(email for (email,) in self.session.query(Cliente.email_normalizado).filter(
+                    Cliente.email_normalizado.in_(emails[inicio:inicio + LOTE_CADASTRO])
+                ))
+                cpfs_existentes.update(cpf for (cpf,) in self.session.query(Cliente.cpf_normalizado).filter(
+                    Cliente.cpf_normalizado.in_(cpfs[inicio:inicio + LOTE_CADASTRO])
+                ))
+            
+            for indice, dados in list(validos.items()):
+                if dados['email_normalizado'] in emails_existentes:
+                    resultados[indice]['message'] = 'Email já cadastrado!'
+                elif dados['cpf_normalizado'] in cpfs_existentes:
+                    resultados[indice]['message'] = 'CPF já cadastrado!'
+                else:
+                    continue
+                del validos[indice]
+            
+            # Inserção multi-linha, uma transação por bloco
+            indices = list(validos)
+            for inicio in range(0, len(indices), LOTE_CADASTRO):
+                bloco = indices[inicio:inicio + LOTE_CADASTRO]
+                linhas = [dict(validos[indice]) for indice in bloco]
+                
+                try:
+                    hashes = servico_hash.gerar_hashes([linha.pop('senha') for linha in linhas])
+                    sequencia = self._registrar_alteracao()
+                    agora = datetime.now()
+                    for linha, senha_hash in zip(linhas, hashes):
+                        linha['senha_hash'] = senha_hash
+                        linha['data_cadastro'] = linha['data_atualizacao'] = agora
+                        linha['seq_alteracao'] = sequencia
+                    self.session.execute(insert(Cliente), linhas)
+                    ids = dict(self.session.query(Cliente.email_normalizado, Cliente.id).filter(
+                        Cliente.email_normalizado.in_([linha['email_normalizado'] for linha in linhas])
+                    ).all())
+                    self._indexar_nomes([
+                        (ids[linha['email_normalizado']], linha['nome']) for linha in linhas
+                    ])
+                    self._registrar_cadastros({agora.date(): len(linhas)})
+                    self.session.commit()
+                except Exception as e:
+                    self.session.rollback()
+                    for indice in bloco:
+                        resultados[indice]['message'] = f'Erro ao cadastrar: {str(e)}'
+                    continue
+                
+                for indice, linha in zip(bloco, linhas):
+                    resultados[indice].update({'success': True, 'id': ids.get(linha['email_normalizado'])})
+            
+        except Exception as e:
+            self.session.rollback()
+            return {'success': False, 'message': f'Erro ao cadastrar lote: {str(e)}'}
+        
+        cadastrados = sum(1 for resultado in resultados if resultado['success'])
+        return {
+            'success': True,
+            'message': f'{cadastrados} de {len(registros)} clientes cadastrados!',
+            'cadastrados': cadastrados,
+            'falhas': len(registros) - cadastrados,
+            'resultados': resultados
+        }
+    
+    def listar_clientes(self, limite=None, cursor=None, campos=None, ordenacao='id'):
+        """
+        Lista clientes paginados por cursor (keyset)
+        Args:
+            limite: quantidade máxima de clientes na página
+            cursor: cursor opaco retornado em next_cursor pela página anterior
+            campos: lista de campos a retornar (todos se None)
+            ordenacao: 'id' ou 'data_cadastro'
+        """
+        try:
+            limite = LIMITE_PADRAO if limite is None else int(limite)
+            if limite < 1 or limite > LIMITE_MAXIMO:
+                raise ValueError(f'limit deve estar entre 1 e {LIMITE_MAXIMO}!')
+            
+            if ordenacao not in ORDENACOES:
+                raise ValueError(f'sort deve ser um de: {", ".join(ORDENACOES)}!')
+            
+            campos = validar_campos(campos)
+            
+            # Colunas de ordenação são sempre selecionadas para montar o próximo cursor
+            chaves = ['id'] if ordenacao == 'id' else ['data_cadastro', 'id']
+            colunas = campos + [chave for chave in chaves if chave not in campos]
+            
+            query = self.session_leitura.query(*[getattr(Cliente, coluna) for coluna in colunas])
+            
+            if cursor:
+                posicao = decodificar_cursor(cursor)
+                if ordenacao == 'id':
+                    query = query.filter(Cliente.id > posicao['id'])
+                else:
+                    data_cadastro = datetime.fromisoformat(posicao['data_cadastro'])
+                    query = query.filter(or_(
+                        Cliente.data_cadastro > data_cadastro,
+                        and_(Cliente.data_cadastro == data_cadastro, Cliente.id > posicao['id'])
+                    ))
+            
+            query = query.order_by(*[getattr(Cliente, chave) for chave in chaves])
+            
+            # Busca uma linha a mais para saber se existe próxima página
+            linhas = query.limit(limite + 1).all()
+            proximo_cursor = None
+            if len(linhas) > limite:
+                linhas = linhas[:limite]
+                ultima = linhas[-1]
+                posicao = {'id': ultima.id}
+                if ordenacao == 'data_cadastro':
+                    posicao['data_cadastro'] = ultima.data_cadastro.isoformat()
+                proximo_cursor = codificar_cursor(posicao)
+            
             return {
-                'success': True, 
-                'clientes': [ClienteResponseDTO(cliente).to_dict() for cliente in clientes]
+                'success': True,
+                'clientes': serializar_linhas(linhas, campos),
+                'next_cursor': proximo_cursor
             }
         except Exception as e:
             return {'success': False, 'message': f'Erro ao listar: {str(e)}'}
     
+    def exportar_clientes(self, formato='ndjson', campos=None):
+        """
+        Exporta todos os clientes em streaming
+        Args:
+            formato: 'ndjson' ou 'csv'
+            campos: lista de campos a exportar (todos se None)
+        Returns:
+            gerador de blocos de texto; a validação é feita antes do primeiro bloco
+        """
+        if formato not in FORMATOS_EXPORTACAO:
+            raise ValueError(f'format deve ser um de: {", ".join(FORMATOS_EXPORTACAO)}!')
+        campos = validar_campos(campos)
+        consulta = select(*[getattr(Cliente, campo) for campo in campos]).order_by(Cliente.id)
+        return self._gerar_exportacao(consulta, formato, campos)
+    
+    def _gerar_exportacao(self, consulta, formato, campos):
+        """Percorre a tabela com cursor no servidor, emitindo um bloco por lote"""
+        # Conexão própria: o streaming não pode disputar a sessão compartilhada
+        with self.db.conectar_leitura() as conn:
+            resultado = conn.execution_options(
+                stream_results=True, yield_per=LOTE_EXPORTACAO
+            ).execute(consulta)
+            
+            buffer = io.StringIO()
+            writer = csv.writer(buffer) if formato == 'csv' else None
+            if writer:
+                writer.writerow(campos)
+            
+            for lote in resultado.partitions():
+                for dados in serializar_linhas(lote, campos):
+                    if writer:
+                        writer.writerow([dados[campo] for campo in campos])
+                    else:
+                        buffer.write(json.dumps(dados, ensure_ascii=False))
+                        buffer.write('\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            
+            if buffer.tell():
+                yield buffer.getvalue()
+    
     def buscar_cliente(self, id=None, email=None, cpf=None):
-        """Busca cliente por ID, email ou CPF"""
+        """
+        Busca cliente por ID, email ou CPF (leitura via cache)
+        O cache guarda os dados sob a chave do id; email e CPF apontam para o id,
+        e o resultado só é aceito se ainda corresponder ao email/CPF buscado.
+        Assim, escritas só precisam invalidar a chave do id.
+        """
         try:
+            em_cache = self._buscar_em_cache(id=id, email=email, cpf=cpf)
+            if em_cache is not None:
+                return {'success': True, 'cliente': em_cache}
+            
             cliente = None
             if id:
-                cliente = self.session.query(Cliente).filter_by(id=id).first()
+                cliente = self.session_leitura.query(Cliente).filter_by(id=id).first()
             elif email:
-                cliente = self.session.query(Cliente).filter_by(email=email).first()
+                cliente = self.session_leitura.query(Cliente).filter_by(
+                    email_normalizado=Cliente.normalizar_email(email)
+                ).first()
             elif cpf:
-                cliente = self.session.query(Cliente).filter_by(cpf=cpf).first()
+                cliente = self.session_leitura.query(Cliente).filter_by(
+                    cpf_normalizado=Cliente.normalizar_cpf(cpf)
+                ).first()
             
             if cliente:
                 response_dto = ClienteResponseDTO(cliente)
-                return {'success': True, 'cliente': response_dto.to_dict()}
+                dados = response_dto.to_dict()
+                chave_id, chave_email, chave_cpf = chaves_cache(cliente)
+                cache_clientes.set(chave_id, dados)
+                cache_clientes.set(chave_email, cliente.id)
+                cache_clientes.set(chave_cpf, cliente.id)
+                return {'success': True, 'cliente': dados}
             return {'success': True, 'cliente': None}
             
         except Exception as e:
             return {'success': False, 'message': f'Erro ao buscar: {str(e)}'}
     
+    def buscar_clientes_lote(self, ids=None, emails=None, cpfs=None, campos=None):
+        """
+        Busca vários clientes de uma vez, por ids, emails ou CPFs (um tipo por chamada)
+        Chaves em cache são respondidas sem consulta; as demais com IN por blocos.
+        Returns:
+            clientes na ordem das chaves recebidas (sem repetições) e
+            nao_encontrados com as chaves sem cliente correspondente
+        """
+        try:
+            informados = [(nome, chaves) for nome, chaves in (('ids', ids), ('emails', emails), ('cpfs', cpfs))
+                          if chaves is not None]
+            if len(informados) != 1:
+                raise ValueError('Informe uma lista em ids, emails ou cpfs!')
+            tipo, chaves = informados[0]
+            if not isinstance(chaves, list):
+                raise ValueError(f'{tipo} deve ser uma lista!')
+            if len(chaves) > LIMITE_BUSCA_LOTE:
+                raise ValueError(f'Máximo de {LIMITE_BUSCA_LOTE} chaves por busca!')
+            campos = validar_campos(campos)
+            
+            # Chave normalizada -> chave como recebida, na ordem de entrada
+            if tipo == 'ids' and not all(isinstance(chave, int) and not isinstance(chave, bool) for chave in chaves):
+                raise ValueError('ids devem ser inteiros!')
+            normalizar, coluna = {
+                'ids': (lambda chave: chave, Cliente.id),
+                'emails': (lambda chave: Cliente.normalizar_email(str(chave)), Cliente.email_normalizado),
+                'cpfs': (lambda chave: Cliente.normalizar_cpf(str(chave)), Cliente.cpf_normalizado),
+            }[tipo]
+            normalizadas = {}
+            for chave in chaves:
+                normalizadas.setdefault(normalizar(chave), chave)
+            
+            encontrados = {}
+            filtro = {'ids': 'id', 'emails': 'email', 'cpfs': 'cpf'}[tipo]
+            for chave in normalizadas:
+                em_cache = self._buscar_em_cache(**{filtro: chave})
+                if em_cache is not None:
+                    encontrados[chave] = {campo: em_cache[campo] for campo in campos}
+            
+            # A coluna da chave vai no fim da linha: serializar_linhas ignora colunas extras
+            faltantes = [chave for chave in normalizadas if chave not in encontrados]
+            colunas = [getattr(Cliente, campo) for campo in campos] + [coluna]
+            for inicio in range(0, len(faltantes), LOTE_CONSULTA_IN):
+                linhas = self.session_leitura.execute(
+                    select(*colunas).where(coluna.in_(faltantes[inicio:inicio + LOTE_CONSULTA_IN]))
+                ).all()
+                for linha, dados in zip(linhas, serializar_linhas(linhas, campos)):
+                    encontrados[linha[-1]] = dados
+            
+            return {
+                'success': True,
+                'clientes': [encontrados[chave] for chave in normalizadas if chave in encontrados],
+                'nao_encontrados': [original for chave, original in normalizadas.items() if chave not in encontrados]
+            }
+        except Exception as e:
+            return {'success': False, 'message': f'Erro na busca em lote: {str(e)}'}
+    
+    def _buscar_em_cache(self, id=None, email=None, cpf=None):
+        """Dados do cliente em cache, ou None (ausente ou desatualizado)"""
+        if not id:
+            chave = chave_cache(email=email, cpf=cpf)
+            id = cache_clientes.get(chave) if chave else None
+            if id is None:
+                return None
+        
+        dados = cache_clientes.get(chave_cache(id=id))
+        if dados is None:
+            return None
+        if email and Cliente.normalizar_email(dados['email']) != Cliente.normalizar_email(email):
+            return None
+        if cpf and Cliente.normalizar_cpf(dados['cpf']) != Cliente.normalizar_cpf(cpf):
+            return None
+        return dados
+
+    def validador_cliente(self, id):
+        """
+        Versão e data de atualização do cliente, para requisições condicionais
+        Lê só essas colunas pela chave primária, sem carregar nem serializar o cliente.
+        Não usa o cache: com vários processos, a entrada local pode ser anterior a uma
+        alteração feita em outro worker, e um 304 a partir dela prenderia o dado antigo
+        no requisitante. Retorna None se não existir.
+        """
+        campos = ['versao', 'data_atualizacao']
+        linha = self.session_leitura.execute(
+            select(Cliente.versao, Cliente.data_atualizacao).where(Cliente.id == id)
+        ).first()
+        return serializar_linhas([linha], campos)[0] if linha else None
+
+    def versao_colecao(self):
+        """
+        Versão barata da coleção: total de clientes (somado dos totais diários)
+        e o contador de alterações, que toda escrita incrementa, numa única consulta
+        """
+        total = select(func.coalesce(func.sum(ClienteCadastroDiario.total), 0)).scalar_subquery()
+        sequencia = select(ClienteSequencia.valor).where(ClienteSequencia.id == 1).scalar_subquery()
+        linha = self.session_leitura.execute(select(total, sequencia)).one()
+        return {'total': int(linha[0]), 'sequencia': linha[1]}
+
     def atualizar_cliente(self, id, dados):
         """
         Atualiza dados de um cliente existente
@@ -103,18 +542,27 @@ class ClienteController:
             dados: dict com campos a serem atualizados (nome, email, telefone, data_nascimento)
         """
         try:
+            # bcrypt antes de qualquer escrita: nada fica bloqueado durante o hash
+            senha_hash = dados.get('senha_hash')
+            if not senha_hash and dados.get('senha'):
+                senha_hash = servico_hash.gerar_hash(dados['senha'])
+            
             cliente = self.session.query(Cliente).filter_by(id=id).first()
             
             if not cliente:
                 return {'success': False, 'message': 'Cliente não encontrado!'}
             
-            if 'nome' in dados and dados['nome']:
+            chaves_antigas = chaves_cache(cliente)
+            sequencia = self._registrar_alteracao()
+            
+            nome_alterado = bool(dados.get('nome')) and dados['nome'] != cliente.nome
+            if nome_alterado:
                 cliente.nome = dados['nome']
             
             if 'email' in dados and dados['email'] and dados['email'] != cliente.email:
                 # Verifica se email já existe em outro cliente
-                email_existente = self.session.query(Cliente).filter(
-                    Cliente.email == dados['email'],
+                email_existente = self.session.query(Cliente.id).filter(
+                    Cliente.email_normalizado == Cliente.normalizar_email(dados['email']),
                     Cliente.id != id
                 ).first()
                 
@@ -131,16 +579,20 @@ class ClienteController:
                     dados['data_nascimento'], '%Y-%m-%d'
                 ).date()
             
-            if 'senha' in dados and dados['senha']:
-                senha_hash = bcrypt.hashpw(
-                    dados['senha'].encode('utf-8'),
-                    bcrypt.gensalt()
-                )
-                cliente.senha_hash = senha_hash.decode('utf-8')
+            if senha_hash:
+                cliente.senha_hash = senha_hash
             
             cliente.data_atualizacao = datetime.now()
+            cliente.seq_alteracao = sequencia
+            # Incremento no próprio UPDATE: PUTs simultâneos não perdem versões
+            cliente.versao = Cliente.versao + 1
+            
+            # Reindexa por último: o autoflush grava todas as alterações em um único UPDATE
+            if nome_alterado:
+                self._indexar_nomes([(cliente.id, cliente.nome)])
             
             self.session.commit()
+            cache_clientes.delete(*chaves_antigas, *chaves_cache(cliente))
             
             response_dto = ClienteResponseDTO(cliente)
             
@@ -150,10 +602,157 @@ class ClienteController:
                 'cliente': response_dto.to_dict()
             }
             
+        except ServicoSaturadoError:
+            self.session.rollback()
+            raise
         except Exception as e:
             self.session.rollback()
             return {'success': False, 'message': f'Erro ao atualizar: {str(e)}'}
     
+    def atualizar_parcial(self, id, versao, dados):
+        """
+        Atualização parcial com concorrência otimista em um único UPDATE
+        (UPDATE ... WHERE id = ? AND versao = ?, com RETURNING quando o banco suporta).
+        Conflitos de email são detectados pelo índice único, sem SELECT prévio.
+        Args:
+            id: ID do cliente
+            versao: versão lida pelo cliente
+            dados: dict com campos a alterar (nome, email, telefone, data_nascimento)
+        Returns:
+            dict com success; em falhas, 'motivo' é 'conflito', 'nao_encontrado' ou 'invalido'
+        """
+        try:
+            resultado = self._aplicar_atualizacao_parcial(id, versao, dados)
+            if resultado['success']:
+                self.session.commit()
+                cache_clientes.delete(chave_cache(id=id))
+            else:
+                self.session.rollback()
+            return resultado
+        except IntegrityError:
+            self.session.rollback()
+            return {'success': False, 'motivo': 'invalido', 'message': 'Email já cadastrado para outro cliente!'}
+        except Exception as e:
+            self.session.rollback()
+            return {'success': False, 'motivo': 'invalido', 'message': f'Erro ao atualizar: {str(e)}'}
+    
+    def atualizar_parcial_lote(self, itens):
+        """
+        Aplica várias atualizações parciais em uma transação
+        Args:
+            itens: lista de dicts com id, versao e os campos a alterar
+        Returns:
+            relatório por item; um conflito desfaz só o próprio item (savepoint)
+        """
+        if len(itens) > LIMITE_ATUALIZACAO_LOTE:
+            return {'success': False, 'message': f'Máximo de {LIMITE_ATUALIZACAO_LOTE} itens por lote!'}
+        
+        resultados = []
+        try:
+            for indice, item in enumerate(itens):
+                if not isinstance(item, dict) or 'id' not in item:
+                    resultados.append({'indice': indice, 'success': False, 'motivo': 'invalido',
+                                       'message': 'Item deve ter id e versao!'})
+                    continue
+                
+                # Campos inválidos são recusados sem abrir savepoint
+                dto = AtualizarClienteDTO(item)
+                erros = dto.erros()
+                if erros:
+                    resultados.append({'indice': indice, 'id': item['id'], 'success': False, 'motivo': 'invalido',
+                                       'message': next(iter(erros.values())), 'erros': erros})
+                    continue
+                
+                savepoint = self.session.begin_nested()
+                try:
+                    resultado = self._aplicar_atualizacao_parcial(item['id'], item.get('versao'), dto.to_dict())
+                except IntegrityError:
+                    savepoint.rollback()
+                    resultado = {'success': False, 'motivo': 'invalido',
+                                 'message': 'Email já cadastrado para outro cliente!'}
+                else:
+                    savepoint.commit()
+                resultado.update({'indice': indice, 'id': item['id']})
+                resultados.append(resultado)
+            
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            return {'success': False, 'message': f'Erro ao atualizar lote: {str(e)}'}
+        
+        cache_clientes.delete(*[chave_cache(id=r['id']) for r in resultados if r['success']])
+        atualizados = sum(1 for resultado in resultados if resultado['success'])
+        return {
+            'success': True,
+            'message': f'{atualizados} de {len(itens)} clientes atualizados!',
+            'atualizados': atualizados,
+            'falhas': len(itens) - atualizados,
+            'resultados': resultados
+        }
+    
+    def _aplicar_atualizacao_parcial(self, id, versao, dados):
+        """
+        Executa o UPDATE versionado na transação corrente, sem commit nem rollback
+        Levanta IntegrityError se o novo email já pertencer a outro cliente.
+        """
+        tabela = Cliente.__table__
+        try:
+            if versao is None:
+                raise ValueError('Informe a versão (versao ou If-Match)!')
+            versao = int(versao)
+            
+            valores = {}
+            if dados.get('nome'):
+                valores['nome'] = dados['nome']
+            if dados.get('email'):
+                valores['email'] = dados['email']
+                valores['email_normalizado'] = Cliente.normalizar_email(dados['email'])
+            if dados.get('telefone'):
+                valores['telefone'] = Cliente.formatar_telefone(dados['telefone'])
+            if dados.get('data_nascimento'):
+                valores['data_nascimento'] = datetime.strptime(dados['data_nascimento'], '%Y-%m-%d').date()
+            if not valores:
+                raise ValueError('Nenhum campo para atualizar!')
+        except (ValueError, TypeError) as e:
+            return {'success': False, 'motivo': 'invalido', 'message': str(e)}
+        
+        valores['seq_alteracao'] = self._registrar_alteracao()
+        valores['versao'] = tabela.c.versao + 1
+        valores['data_atualizacao'] = datetime.now()
+        
+        comando = update(tabela).where(tabela.c.id == id, tabela.c.versao == versao).values(**valores)
+        colunas = [tabela.c[campo] for campo in CAMPOS_RESPOSTA]
+        usa_returning = self.session.get_bind().dialect.update_returning
+        if usa_returning:
+            comando = comando.returning(*colunas)
+        
+        resultado = self.session.execute(comando)
+        linha = resultado.first() if usa_returning else None
+        atualizado = linha is not None if usa_returning else resultado.rowcount == 1
+        
+        if not atualizado:
+            # Caminho de falha: uma leitura para distinguir inexistente de versão antiga
+            atual = self.session.execute(select(tabela.c.versao).where(tabela.c.id == id)).scalar()
+            if atual is None:
+                return {'success': False, 'motivo': 'nao_encontrado', 'message': 'Cliente não encontrado!'}
+            return {
+                'success': False,
+                'motivo': 'conflito',
+                'message': 'Cliente alterado por outra requisição; recarregue e tente novamente!',
+                'versao_atual': atual
+            }
+        
+        if 'nome' in valores:
+            self._indexar_nomes([(id, valores['nome'])])
+        if linha is None:
+            linha = self.session.execute(select(*colunas).where(tabela.c.id == id)).first()
+        
+        return {
+            'success': True,
+            'message': 'Cliente atualizado com sucesso!',
+            'cliente': serializar_linhas([linha])[0]
+        }
+    
     def deletar_cliente(self, id):
         """
         Deleta um cliente do banco de dados
@@ -166,8 +765,17 @@ class ClienteController:
             if not cliente:
                 return {'success': False, 'message': 'Cliente não encontrado!'}
             
+            chaves = chaves_cache(cliente)
+            sequencia = self._registrar_alteracao()
+            self.session.execute(delete(ClienteTermo).where(ClienteTermo.cliente_id == cliente.id))
+            self.session.add(ClienteExclusao(
+                cliente_id=cliente.id, data_exclusao=datetime.now(), seq_alteracao=sequencia
+            ))
+            if cliente.data_cadastro:
+                self._registrar_cadastros({cliente.data_cadastro.date(): -1})
             self.session.delete(cliente)
             self.session.commit()
+            cache_clientes.delete(*chaves)
             
             return {
                 'success': True,
@@ -179,38 +787,285 @@ class ClienteController:
             return {'success': False, 'message': f'Erro ao deletar: {str(e)}'}
     
     
+    def listar_alteracoes(self, cursor=None, limite=None, campos=None):
+        """
+        Feed de alterações para sincronização incremental
+        Intercala, em ordem de seq_alteracao e id, os clientes inseridos/alterados
+        depois do cursor e as exclusões registradas em clientes_exclusoes; o custo
+        acompanha o volume de alterações, não a tabela. seq_alteracao vem do contador
+        de alterações, confirmado em ordem crescente: quando uma posição aparece,
+        todas as anteriores já estão visíveis, e o cursor nunca passa por cima de
+        uma transação ainda em andamento.
+        Args:
+            cursor: next_cursor da chamada anterior (None começa do início)
+            limite: máximo de alterações na página
+            campos: campos do cliente a retornar nas inserções/alterações (todos se None)
+        Returns:
+            alteracoes (operacao insert/update/delete), next_cursor (sempre presente,
+            para retomar depois) e has_more
+        """
+        try:
+            limite = LIMITE_FEED_PADRAO if limite is None else int(limite)
+            if limite < 1 or limite > LIMITE_FEED_MAXIMO:
+                raise ValueError(f'limit deve estar entre 1 e {LIMITE_FEED_MAXIMO}!')
+            campos = validar_campos(campos)
+            posicao = decodificar_cursor(cursor) if cursor else {}
+            for lado in ('clientes', 'exclusoes'):
+                if lado in posicao and not all(isinstance(valor, int) for valor in posicao[lado]):
+                    raise ValueError('Cursor inválido!')
+            
+            colunas = campos + [
+                coluna for coluna in ('id', 'data_atualizacao', 'versao', 'seq_alteracao') if coluna not in campos
+            ]
+            consulta = select(*[getattr(Cliente, coluna) for coluna in colunas])
+            if 'clientes' in posicao:
+                sequencia, id = posicao['clientes']
+                consulta = consulta.where(or_(
+                    Cliente.seq_alteracao > sequencia,
+                    and_(Cliente.seq_alteracao == sequencia, Cliente.id > id)
+                ))
+            linhas = self.session.execute(
+                consulta.order_by(Cliente.seq_alteracao, Cliente.id).limit(limite + 1)
+            ).all()
+            
+            consulta = select(
+                ClienteExclusao.id, ClienteExclusao.cliente_id, ClienteExclusao.data_exclusao,
+                ClienteExclusao.seq_alteracao
+            )
+            if 'exclusoes' in posicao:
+                sequencia, id = posicao['exclusoes']
+                consulta = consulta.where(or_(
+                    ClienteExclusao.seq_alteracao > sequencia,
+                    and_(ClienteExclusao.seq_alteracao == sequencia, ClienteExclusao.id > id)
+                ))
+            exclusoes = self.session.execute(
+                consulta.order_by(ClienteExclusao.seq_alteracao, ClienteExclusao.id).limit(limite + 1)
+            ).all()
+            
+            # Intercala as duas sequências; cada uma avança o seu lado do cursor
+            clientes = serializar_linhas(linhas, campos)
+            alteracoes = []
+            i = j = 0
+            while len(alteracoes) < limite and (i < len(linhas) or j < len(exclusoes)):
+                if j == len(exclusoes) or (i < len(linhas) and linhas[i].seq_alteracao <= exclusoes[j].seq_alteracao):
+                    linha = linhas[i]
+                    alteracoes.append({
+                        'operacao': 'insert' if linha.versao == 1 else 'update',
+                        'id': linha.id,
+                        'alterado_em': linha.data_atualizacao.isoformat(' ', 'seconds'),
+                        'cliente': clientes[i]
+                    })
+                    posicao['clientes'] = [linha.seq_alteracao, linha.id]
+                    i += 1
+                else:
+                    exclusao = exclusoes[j]
+                    alteracoes.append({
+                        'operacao': 'delete',
+                        'id': exclusao.cliente_id,
+                        'alterado_em': exclusao.data_exclusao.isoformat(' ', 'seconds')
+                    })
+                    posicao['exclusoes'] = [exclusao.seq_alteracao, exclusao.id]
+                    j += 1
+            
+            return {
+                'success': True,
+                'alteracoes': alteracoes,
+                'next_cursor': codificar_cursor(posicao),
+                'has_more': i < len(linhas) or j < len(exclusoes)
+            }
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao listar alterações: {str(e)}'}
+    
+    def estatisticas_cache(self):
+        """Retorna os contadores de acerto, falta e remoção do cache"""
+        return {'success': True, 'cache': cache_clientes.stats()}
+    
+    def _registrar_alteracao(self):
+        """
+        Incrementa o contador de alterações na transação corrente e retorna o novo valor
+        Chamado antes de qualquer outra escrita da transação (e fora do bcrypt): o UPDATE
+        bloqueia a linha do contador até o commit, e quem já a detém não espera por
+        nenhum outro bloqueio de escrita, o que evita deadlocks entre escritores. O novo
+        valor volta no próprio UPDATE (RETURNING ou, no MySQL, LAST_INSERT_ID).
+        """
+        tabela = ClienteSequencia.__table__
+        dialeto = self.session.get_bind().dialect
+        if dialeto.name == 'mysql':
+            # Sem RETURNING no MySQL: LAST_INSERT_ID(expr) devolve o novo valor na própria
+            # resposta do UPDATE (lastrowid), sem um SELECT a mais
+            comando = update(tabela).where(tabela.c.id == 1).values(valor=func.last_insert_id(tabela.c.valor + 1))
+            return self.session.execute(comando).lastrowid
+        comando = update(tabela).where(tabela.c.id == 1).values(valor=tabela.c.valor + 1)
+        if dialeto.update_returning:
+            return self.session.execute(comando.returning(tabela.c.valor)).scalar_one()
+        self.session.execute(comando)
+        return self.session.execute(select(tabela.c.valor).where(tabela.c.id == 1)).scalar_one()
+    
+    def _registrar_cadastros(self, variacoes):
+        """
+        Aplica variações no total diário de cadastros, na transação corrente
+        Args:
+            variacoes: dict {date: quantidade} (negativa em exclusões)
+        """
+        tabela = ClienteCadastroDiario.__table__
+        dialeto = self.session.get_bind().dialect.name
+        for dia, quantidade in variacoes.items():
+            if dialeto == 'mysql':
+                comando = mysql_insert(tabela).values(dia=dia, total=quantidade)
+                comando = comando.on_duplicate_key_update(total=tabela.c.total + quantidade)
+            elif dialeto == 'sqlite':
+                comando = sqlite_insert(tabela).values(dia=dia, total=quantidade)
+                comando = comando.on_conflict_do_update(
+                    index_elements=[tabela.c.dia],
+                    set_={'total': tabela.c.total + quantidade}
+                )
+            else:
+                atualizado = self.session.execute(
+                    update(tabela).where(tabela.c.dia == dia).values(total=tabela.c.total + quantidade)
+                )
+                if atualizado.rowcount:
+                    continue
+                comando = insert(tabela).values(dia=dia, total=quantidade)
+            self.session.execute(comando)
+    
     def contar_clientes(self):
-        """Retorna o número total de clientes cadastrados"""
+        """Retorna o número total de clientes cadastrados (a partir dos totais diários)"""
         try:
-            total = self.session.query(Cliente).count()
-            return {'success': True, 'total': total}
+            total = self.session_leitura.query(
+                func.coalesce(func.sum(ClienteCadastroDiario.total), 0)
+            ).scalar()
+            return {'success': True, 'total': int(total)}
         except Exception as e:
             return {'success': False, 'message': f'Erro ao contar clientes: {str(e)}'}
     
-    def buscar_por_nome(self, nome):
-        """Busca clientes por nome (busca parcial)"""
+    def estatisticas_cadastros(self, data_inicio=None, data_fim=None, agrupamento='dia'):
+        """
+        Totais de cadastros por dia ou mês, lidos da tabela de totais diários
+        Args:
+            data_inicio, data_fim: datas 'YYYY-MM-DD' (inclusivas, opcionais)
+            agrupamento: 'dia' ou 'mes'
+        """
         try:
-            clientes = self.session.query(Cliente).filter(
-                Cliente.nome.ilike(f'%{nome}%')
-            ).all()
+            if agrupamento not in ('dia', 'mes'):
+                raise ValueError("group deve ser 'day' ou 'month'!")
+            
+            filtros = []
+            if data_inicio:
+                filtros.append(ClienteCadastroDiario.dia >= datetime.strptime(data_inicio, '%Y-%m-%d').date())
+            if data_fim:
+                filtros.append(ClienteCadastroDiario.dia <= datetime.strptime(data_fim, '%Y-%m-%d').date())
+            
+            if agrupamento == 'dia':
+                linhas = self.session_leitura.query(
+                    ClienteCadastroDiario.dia, ClienteCadastroDiario.total
+                ).filter(*filtros, ClienteCadastroDiario.total > 0).order_by(ClienteCadastroDiario.dia).all()
+                periodos = [{'periodo': dia.strftime('%Y-%m-%d'), 'total': total} for dia, total in linhas]
+            else:
+                ano = extract('year', ClienteCadastroDiario.dia)
+                mes = extract('month', ClienteCadastroDiario.dia)
+                linhas = self.session_leitura.query(
+                    ano, mes, func.sum(ClienteCadastroDiario.total)
+                ).filter(*filtros).group_by(ano, mes).having(
+                    func.sum(ClienteCadastroDiario.total) > 0
+                ).order_by(ano, mes).all()
+                periodos = [
+                    {'periodo': f'{int(a):04d}-{int(m):02d}', 'total': int(total)}
+                    for a, m, total in linhas
+                ]
             
             return {
                 'success': True,
-                'clientes': [ClienteResponseDTO(cliente).to_dict() for cliente in clientes]
+                'total': self.contar_clientes().get('total'),
+                'total_periodo': sum(periodo['total'] for periodo in periodos),
+                'agrupamento': agrupamento,
+                'periodos': periodos
+            }
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao gerar estatísticas: {str(e)}'}
+    
+    def _indexar_nomes(self, pares):
+        """
+        Atualiza o índice invertido de nomes na transação corrente
+        Args:
+            pares: lista de (cliente_id, nome)
+        """
+        ids = [cliente_id for cliente_id, _ in pares]
+        self.session.execute(delete(ClienteTermo).where(ClienteTermo.cliente_id.in_(ids)))
+        termos = [
+            {'termo': termo, 'cliente_id': cliente_id}
+            for cliente_id, nome in pares
+            for termo in Cliente.tokenizar_nome(nome)
+        ]
+        if termos:
+            self.session.execute(insert(ClienteTermo), termos)
+    
+    def buscar_por_nome(self, nome, limite=None, offset=0, campos=None):
+        """
+        Busca clientes por nome usando o índice de termos
+        Cada palavra da busca casa por prefixo, sem diferenciar acentos e maiúsculas;
+        todos os termos precisam casar. Resultados ordenados por relevância
+        (termos exatos valem mais que prefixos) e depois por id.
+        """
+        try:
+            limite = LIMITE_BUSCA_PADRAO if limite is None else int(limite)
+            if limite < 1 or limite > LIMITE_BUSCA_MAXIMO:
+                raise ValueError(f'limit deve estar entre 1 e {LIMITE_BUSCA_MAXIMO}!')
+            offset = int(offset or 0)
+            if offset < 0:
+                raise ValueError('offset não pode ser negativo!')
+            campos = validar_campos(campos)
+            
+            termos = Cliente.tokenizar_nome(nome)
+            if not termos:
+                return {'success': True, 'clientes': [], 'has_more': False}
+            
+            # Prefixo como intervalo [termo, sucessor): usa o índice em qualquer banco
+            condicoes = [
+                and_(ClienteTermo.termo >= termo, ClienteTermo.termo < termo[:-1] + chr(ord(termo[-1]) + 1))
+                for termo in termos
+            ]
+            relevancia = func.sum(case((ClienteTermo.termo.in_(termos), 2), else_=1))
+            consulta = (
+                select(ClienteTermo.cliente_id, relevancia.label('relevancia'))
+                .where(or_(*condicoes))
+                .group_by(ClienteTermo.cliente_id)
+                .having(and_(*[func.max(case((condicao, 1), else_=0)) == 1 for condicao in condicoes]))
+                .order_by(relevancia.desc(), ClienteTermo.cliente_id)
+                .limit(limite + 1)
+                .offset(offset)
+            )
+            ids = [linha.cliente_id for linha in self.session_leitura.execute(consulta)]
+            
+            tem_mais = len(ids) > limite
+            ids = ids[:limite]
+            colunas = campos if 'id' in campos else campos + ['id']
+            linhas = {
+                linha.id: linha for linha in self.session_leitura.query(
+                    *[getattr(Cliente, coluna) for coluna in colunas]
+                ).filter(Cliente.id.in_(ids))
+            }
+            
+            return {
+                'success': True,
+                'clientes': serializar_linhas([linhas[id] for id in ids if id in linhas], campos),
+                'has_more': tem_mais
             }
         except Exception as e:
             return {'success': False, 'message': f'Erro ao buscar por nome: {str(e)}'}
     
-    def buscar_por_periodo(self, data_inicio, data_fim):
+    def buscar_por_periodo(self, data_inicio, data_fim, campos=None):
         """Busca clientes cadastrados em um período"""
         try:
-            clientes = self.session.query(Cliente).filter(
+            campos = validar_campos(campos)
+            linhas = self.session_leitura.query(
+                *[getattr(Cliente, campo) for campo in campos]
+            ).filter(
                 Cliente.data_cadastro.between(data_inicio, data_fim)
-            ).all()
+            ).order_by(Cliente.data_cadastro, Cliente.id).all()
             
             return {
                 'success': True,
-                'clientes': [ClienteResponseDTO(cliente).to_dict() for cliente in clientes]
+                'clientes': serializar_linhas(linhas, campos)
             }
         except Exception as e:
             return {'success': False, 'message': f'Erro ao buscar por período: {str(e)}'}
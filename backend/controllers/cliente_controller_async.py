@@ -0,0 +1,84 @@
+# controllers/cliente_controller_async.py
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from controllers.cliente_controller import ClienteController
+from database.async_conn import get_async_engine
+from services.hash_service import servico_hash
+
+
+class ClienteControllerAsync:
+    """
+    Versão assíncrona do ClienteController.
+    Cada chamada abre uma AsyncSession própria e executa a mesma regra de negócio
+    do controller síncrono via run_sync: o código ORM roda sobre a conexão
+    assíncrona, sem bloquear o event loop em I/O. O bcrypt, que é CPU, é feito
+    antes, fora da sessão, no pool do servico_hash.
+    """
+    
+    def __init__(self):
+        self._Session = None
+    
+    @property
+    def Session(self):
+        if self._Session is None:
+            self._Session = async_sessionmaker(get_async_engine())
+        return self._Session
+    
+    async def _executar(self, metodo, *args, **kwargs):
+        async with self.Session() as session:
+            return await session.run_sync(
+                lambda sessao: getattr(ClienteController(sessao), metodo)(*args, **kwargs)
+            )
+    
+    async def _gerar_hash(self, senha):
+        return await servico_hash.gerar_hash_async(senha)
+    
+    async def cadastrar_cliente(self, dados):
+        # Duplicados são recusados antes do bcrypt, como no controller síncrono
+        erro = await self._executar('verificar_cadastro', dados)
+        if erro:
+            return {'success': False, 'message': erro}
+        dados = dict(dados)
+        dados['senha_hash'] = await self._gerar_hash(dados.pop('senha'))
+        return await self._executar('cadastrar_cliente', dados)
+    
+    async def listar_clientes(self, **kwargs):
+        return await self._executar('listar_clientes', **kwargs)
+    
+    async def buscar_cliente(self, id=None, email=None, cpf=None):
+        return await self._executar('buscar_cliente', id=id, email=email, cpf=cpf)
+    
+    async def atualizar_cliente(self, id, dados):
+        dados = dict(dados)
+        if dados.get('senha'):
+            dados['senha_hash'] = await self._gerar_hash(dados.pop('senha'))
+        return await self._executar('atualizar_cliente', id, dados)
+    
+    async def atualizar_parcial(self, id, versao, dados):
+        return await self._executar('atualizar_parcial', id, versao, dados)
+    
+    async def atualizar_parcial_lote(self, itens):
+        return await self._executar('atualizar_parcial_lote', itens)
+    
+    async def validador_cliente(self, id):
+        return await self._executar('validador_cliente', id)
+    
+    async def versao_colecao(self):
+        return await self._executar('versao_colecao')
+    
+    async def buscar_clientes_lote(self, **kwargs):
+        return await self._executar('buscar_clientes_lote', **kwargs)
+    
+    async def listar_alteracoes(self, **kwargs):
+        return await self._executar('listar_alteracoes', **kwargs)
+    
+    async def deletar_cliente(self, id):
+        return await self._executar('deletar_cliente', id)
+    
+    async def buscar_por_nome(self, nome, **kwargs):
+        return await self._executar('buscar_por_nome', nome, **kwargs)
+    
+    async def estatisticas_cadastros(self, **kwargs):
+        return await self._executar('estatisticas_cadastros', **kwargs)
+    
+    async def estatisticas_cache(self):
+        return await self._executar('estatisticas_cache')
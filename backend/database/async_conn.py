@@ -0,0 +1,63 @@
+import os
+import threading
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from dotenv import load_dotenv
+from models.cliente import Base
+from database.conn import montar_url
+
+load_dotenv()
+
+# Engine assíncrono do processo, criado no primeiro uso (modo async opcional)
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def montar_url_async():
+    """
+    URL do engine assíncrono: ASYNC_DATABASE_URL se definida
+    (ex.: sqlite+aiosqlite:///clientes.db), senão a mesma URL do modo síncrono
+    (DATABASE_URL ou DB_*) com o driver assíncrono (aiomysql ou aiosqlite)
+    """
+    url = os.getenv('ASYNC_DATABASE_URL')
+    if url:
+        return url
+    url = montar_url()
+    driver = {'mysql': 'mysql+aiomysql', 'sqlite': 'sqlite+aiosqlite'}.get(make_url(url).get_backend_name())
+    if driver is None:
+        return url
+    return make_url(url).set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """Retorna o engine assíncrono compartilhado, criando-o na primeira chamada"""
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                url = montar_url_async()
+                opcoes = {'echo': os.getenv('DB_ECHO', '').lower() in ('1', 'true')}
+                if url.startswith('mysql'):
+                    opcoes.update(
+                        pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+                        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+                        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+                        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+                        pool_pre_ping=True
+                    )
+                _async_engine = create_async_engine(url, **opcoes)
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """Fecha o pool assíncrono; o próximo get_async_engine cria outro"""
+    global _async_engine
+    engine, _async_engine = _async_engine, None
+    if engine is not None:
+        await engine.dispose()
+
+
+async def criar_tabelas_async():
+    """Cria as tabelas pelo engine assíncrono (útil para testes locais com aiosqlite)"""
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -1,37 +1,281 @@
+import itertools
 import os
+import threading
+import time
 from urllib.parse import quote_plus
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, make_url, text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool, StaticPool
 from dotenv import load_dotenv
 
+if __name__ == '__main__':
+    # Teste manual (python database/conn.py): os pacotes do app ficam na pasta acima
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics_service import metricas, classe_pool_instrumentada, instrumentar_engine
+
 load_dotenv()
 
-class Database:
-    def __init__(self):
-        self.host = os.getenv('DB_HOST')
-        self.db = os.getenv('DB_NAME')
-        self.user = os.getenv('DB_USER')
-        # Codifica a senha para URL
-        self.password = quote_plus(os.getenv('DB_PASSWORD'))
-        self.port = int(os.getenv('DB_PORT'))
-        
-        url = f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.db}"
-        
-        self.engine = create_engine(
+# Registro único de engines do processo, preenchido no primeiro uso
+_engine = None
+_engine_lock = threading.Lock()
+_roteador_leitura = None
+
+# Réplicas fora do ar são reavaliadas com SELECT 1 após este intervalo (segundos)
+INTERVALO_VERIFICACAO_REPLICA = float(os.getenv('DB_REPLICA_VERIFICACAO', 5))
+
+
+def montar_url():
+    """
+    URL de conexão: DATABASE_URL, se definida (ex.: sqlite:///clientes.db ou
+    mysql+pymysql://...), senão montada a partir das variáveis DB_* (MySQL)
+    """
+    url = os.getenv('DATABASE_URL')
+    if url:
+        return url
+    host = os.getenv('DB_HOST')
+    db = os.getenv('DB_NAME')
+    user = os.getenv('DB_USER')
+    # Codifica a senha para URL
+    password = quote_plus(os.getenv('DB_PASSWORD'))
+    port = int(os.getenv('DB_PORT'))
+    return f"mysql+pymysql://{user}:{password}@{host}:{port}/{db}"
+
+
+def montar_urls_replicas():
+    """URLs das réplicas de leitura, separadas por vírgula em DB_REPLICAS (vazia se não houver)"""
+    return [url.strip() for url in os.getenv('DB_REPLICAS', '').split(',') if url.strip()]
+
+
+def _config(nome, padrao):
+    """Variável de ambiente numérica, lida na criação do engine"""
+    return type(padrao)(os.getenv(nome, padrao))
+
+
+def _opcoes_pool(pool):
+    """Dimensionamento do pool (DB_POOL_*), para MySQL e SQLite em arquivo"""
+    return {
+        'poolclass': classe_pool_instrumentada(QueuePool, pool),
+        'pool_size': _config('DB_POOL_SIZE', 5),
+        'max_overflow': _config('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _config('DB_POOL_TIMEOUT', 30),
+    }
+
+
+def _configurar_sqlite(engine, em_memoria):
+    """Pragmas aplicados a cada conexão nova do SQLite"""
+    cache_kb = _config('DB_SQLITE_CACHE_KB', 65536)
+    mmap_bytes = _config('DB_SQLITE_MMAP_MB', 256) * 1024 * 1024
+    sincronismo = os.getenv('DB_SQLITE_SYNCHRONOUS', 'NORMAL')
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(conexao, registro):
+        cursor = conexao.cursor()
+        if not em_memoria:
+            # WAL: leitores não bloqueiam o escritor; com ele, synchronous=NORMAL é seguro
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute(f'PRAGMA mmap_size={mmap_bytes}')
+        cursor.execute(f'PRAGMA synchronous={sincronismo}')
+        # Valor negativo: tamanho em KiB, não em páginas
+        cursor.execute(f'PRAGMA cache_size=-{cache_kb}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+
+
+def criar_engine(url, pool='primario'):
+    """
+    Cria um engine ajustado ao banco da URL (pool: rótulo do engine nas métricas)
+    - MySQL: pool com tamanho de DB_POOL_SIZE/DB_MAX_OVERFLOW e reciclagem de conexões
+    - SQLite em arquivo: WAL e pragmas de desempenho, pool do mesmo tamanho
+      (conexões são baratas; a espera por lock de escrita é DB_SQLITE_TIMEOUT)
+    - SQLite em memória: uma única conexão para todas as sessões, só para testes
+      de uma thread (com threads simultâneas, o commit/rollback de uma sessão
+      atinge a transação das outras)
+    - Outros bancos: padrões do SQLAlchemy
+    """
+    echo = os.getenv('DB_ECHO', '').lower() in ('1', 'true')
+    backend = make_url(url).get_backend_name()
+
+    if backend == 'mysql':
+        return create_engine(
             url,
-            pool_size=5,
-            max_overflow=10,
             pool_pre_ping=True,
-            echo=False,
+            pool_recycle=_config('DB_POOL_RECYCLE', 3600),
+            echo=echo,
             # Adiciona connect_args para compatibilidade com MySQL 8
             connect_args={
                 'charset': 'utf8mb4',
                 'use_unicode': True,
                 'ssl_disabled': True  # Desabilita SSL se não estiver usando
-            }
+            },
+            **_opcoes_pool(pool)
         )
+
+    if backend == 'sqlite':
+        banco = make_url(url).database
+        em_memoria = not banco or banco == ':memory:' or banco.startswith('file::memory:')
+        opcoes = {'poolclass': StaticPool} if em_memoria else _opcoes_pool(pool)
+        engine = create_engine(
+            url,
+            echo=echo,
+            connect_args={'check_same_thread': False, 'timeout': _config('DB_SQLITE_TIMEOUT', 30)},
+            **opcoes
+        )
+        _configurar_sqlite(engine, em_memoria)
+        return engine
+
+    return create_engine(url, pool_pre_ping=True, echo=echo)
+
+
+def get_engine():
+    """
+    Retorna o engine compartilhado (primário), criando-o na primeira chamada.
+    Nenhuma conexão é aberta aqui: o pool conecta sob demanda.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = instrumentar_engine(criar_engine(montar_url()))
+    return _engine
+
+
+class RoteadorLeitura:
+    """
+    Distribui leituras entre as réplicas em round-robin.
+    A verificação de saúde é o próprio checkout da conexão (com pool_pre_ping):
+    uma réplica que falha sai do rodízio e só é testada de novo após
+    INTERVALO_VERIFICACAO_REPLICA segundos. Sem réplica saudável, quem chama usa o primário.
+    """
+    
+    def __init__(self, engines, intervalo=INTERVALO_VERIFICACAO_REPLICA):
+        self.engines = list(engines)
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._rodizio = itertools.cycle(range(len(self.engines)))
+        # índice -> instante a partir do qual a réplica pode ser testada de novo
+        self._fora_do_ar = {}
+        for indice, engine in enumerate(self.engines):
+            self._observar_falhas(indice, engine)
+    
+    def _observar_falhas(self, indice, engine):
+        # Queda no meio de uma consulta também tira a réplica do rodízio
+        @event.listens_for(engine, 'handle_error')
+        def _falha(contexto):
+            if contexto.is_disconnect:
+                self.marcar_falha(indice)
+    
+    def marcar_falha(self, indice):
+        with self._lock:
+            self._fora_do_ar[indice] = time.monotonic() + self.intervalo
+    
+    def conectar(self):
+        """Conexão com a próxima réplica disponível, ou None se nenhuma responder"""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                indice = next(self._rodizio)
+                liberar_em = self._fora_do_ar.get(indice)
+                if liberar_em is not None:
+                    if time.monotonic() < liberar_em:
+                        continue
+                    # Só uma requisição testa a réplica; as outras seguem pulando até lá
+                    self._fora_do_ar[indice] = time.monotonic() + self.intervalo
+            try:
+                conexao = self.engines[indice].connect()
+            except SQLAlchemyError:
+                self.marcar_falha(indice)
+                continue
+            with self._lock:
+                self._fora_do_ar.pop(indice, None)
+            return conexao
+        return None
+    
+    def disponiveis(self):
+        """Réplicas no rodízio (não marcadas como fora do ar)"""
+        with self._lock:
+            return len(self.engines) - len(self._fora_do_ar)
+    
+    def dispose(self, close=True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+
+def get_roteador_leitura():
+    """Roteador das réplicas de DB_REPLICAS, criado no primeiro uso (None se não houver réplicas)"""
+    global _roteador_leitura
+    if _roteador_leitura is None:
+        urls = montar_urls_replicas()
+        if not urls:
+            return None
+        with _engine_lock:
+            if _roteador_leitura is None:
+                _roteador_leitura = RoteadorLeitura(
+                    instrumentar_engine(criar_engine(url, f'replica-{indice}'), gauges=False, pool=f'replica-{indice}')
+                    for indice, url in enumerate(urls)
+                )
+                metricas.gauge(
+                    'db_replicas_disponiveis', 'Réplicas de leitura no rodízio',
+                    _roteador_leitura.disponiveis
+                )
+    return _roteador_leitura
+
+
+def conectar_leitura():
+    """Conexão para consultas somente leitura: numa réplica saudável ou, na falta, no primário"""
+    roteador = get_roteador_leitura()
+    conexao = roteador.conectar() if roteador else None
+    return conexao or get_engine().connect()
+
+
+def definir_engine(engine):
+    """Registra um engine criado externamente (ex.: SQLite local em benchmarks)"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None and _engine is not engine:
+            _engine.dispose()
+        _engine = instrumentar_engine(engine)
+
+
+def dispose_engine():
+    """Fecha os pools e descarta os engines; o próximo acesso cria outros"""
+    global _engine, _roteador_leitura
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if _roteador_leitura is not None:
+            _roteador_leitura.dispose()
+            _roteador_leitura = None
+
+
+def reiniciar_apos_fork():
+    """
+    Chamado no processo filho após um fork: descarta o pool herdado sem fechar
+    as conexões, que continuam pertencendo ao processo pai.
+    """
+    global _engine_lock
+    _engine_lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _roteador_leitura is not None:
+        _roteador_leitura._lock = threading.Lock()
+        _roteador_leitura.dispose(close=False)
+
+
+# Garante o reinício também em forks fora do gunicorn (multiprocessing etc.)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reiniciar_apos_fork)
+
+
+class Database:
+    def __init__(self):
         self.connection = None
     
+    @property
+    def engine(self):
+        return get_engine()
+    
     def open_connection(self):
         try:
             self.connection = self.engine.connect()
@@ -61,17 +305,11 @@ class Database:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close_connection()
 
-# Usage examples:
-db = Database()
-
-# Method 1: Traditional way
-conn = db.open_connection()
-if conn:
-    print("Conectado com sucesso!")
-    db.close_connection()
 
-# Method 2: Test connection
-if db.test_connection():
-    print("Conexão OK!")
-else:
-    print("Falha na conexão!")
\ No newline at end of file
+if __name__ == '__main__':
+    # Teste manual: python database/conn.py
+    db = Database()
+    if db.test_connection():
+        print("Conexão OK!")
+    else:
+        print("Falha na conexão!")
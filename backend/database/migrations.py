@@ -0,0 +1,228 @@
+from sqlalchemy import inspect, text
+from models.cliente import Cliente, ClienteTermo, ClienteCadastroDiario, ClienteExclusao, ClienteSequencia
+from database.conn import get_engine
+
+LOTE_BACKFILL = 1000
+
+
+class MigracaoError(Exception):
+    """Migração interrompida antes de alterar o banco, por dados que precisam de correção manual"""
+
+
+def _colunas(conn, tabela):
+    return {coluna['name'] for coluna in inspect(conn).get_columns(tabela)}
+
+
+def _indices(conn, tabela):
+    return {indice['name'] for indice in inspect(conn).get_indexes(tabela)}
+
+
+def _adicionar_coluna(conn, tabela, coluna, tipo):
+    """Adiciona a coluna (anulável, para permitir o backfill) se ainda não existir"""
+    if coluna not in _colunas(conn, tabela):
+        conn.execute(text(f'ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}'))
+
+
+def _exigir_nao_nulo(conn, tabela, coluna, tipo):
+    """Torna a coluna NOT NULL após o backfill (o SQLite não altera colunas: mantém como está)"""
+    dialeto = conn.dialect.name
+    anulavel = next(c['nullable'] for c in inspect(conn).get_columns(tabela) if c['name'] == coluna)
+    if not anulavel or dialeto == 'sqlite':
+        return
+    if dialeto == 'mysql':
+        conn.execute(text(f'ALTER TABLE {tabela} MODIFY {coluna} {tipo} NOT NULL'))
+    else:
+        conn.execute(text(f'ALTER TABLE {tabela} ALTER COLUMN {coluna} SET NOT NULL'))
+
+
+def _criar_indice(conn, tabela, nome, colunas, unico=False):
+    if nome not in _indices(conn, tabela):
+        unique = 'UNIQUE ' if unico else ''
+        conn.execute(text(f'CREATE {unique}INDEX {nome} ON {tabela} ({", ".join(colunas)})'))
+
+
+def _duplicados_normalizados(conn):
+    """
+    Clientes cujo email (sem diferenciar maiúsculas) ou CPF (só dígitos) coincide
+    com o de outro cliente; o esquema antigo permitia, os índices únicos não
+    Returns:
+        lista de (campo, valor normalizado, ids)
+    """
+    selecionar = text('SELECT id, email, cpf FROM clientes WHERE id > :ultimo ORDER BY id LIMIT :limite')
+    vistos = {'email': {}, 'cpf': {}}
+    ultimo = 0
+    while True:
+        linhas = conn.execute(selecionar, {'ultimo': ultimo, 'limite': LOTE_BACKFILL}).all()
+        if not linhas:
+            break
+        for linha in linhas:
+            vistos['email'].setdefault(Cliente.normalizar_email(linha.email), []).append(linha.id)
+            vistos['cpf'].setdefault(Cliente.normalizar_cpf(linha.cpf), []).append(linha.id)
+        ultimo = linhas[-1].id
+    return [
+        (campo, valor, ids)
+        for campo, valores in vistos.items()
+        for valor, ids in valores.items() if len(ids) > 1
+    ]
+
+
+def normalizar_email_cpf(conn):
+    """Colunas email_normalizado/cpf_normalizado com backfill, NOT NULL e índices únicos"""
+    indices = _indices(conn, 'clientes')
+    if not {'ix_clientes_email_normalizado', 'ix_clientes_cpf_normalizado'} <= indices:
+        # Verificado antes de qualquer DDL: no MySQL, DDL não é desfeito por rollback
+        duplicados = _duplicados_normalizados(conn)
+        if duplicados:
+            conflitos = '\n'.join(f'  {campo} {valor!r}: ids {", ".join(map(str, ids))}'
+                                   for campo, valor, ids in duplicados)
+            raise MigracaoError(
+                'Clientes com email ou CPF repetidos após a normalização; '
+                f'corrija-os e rode a migração de novo:\n{conflitos}'
+            )
+
+    _adicionar_coluna(conn, 'clientes', 'email_normalizado', 'VARCHAR(100)')
+    _adicionar_coluna(conn, 'clientes', 'cpf_normalizado', 'VARCHAR(11)')
+
+    selecionar = text(
+        'SELECT id, email, cpf FROM clientes '
+        'WHERE (email_normalizado IS NULL OR cpf_normalizado IS NULL) AND id > :ultimo '
+        'ORDER BY id LIMIT :limite'
+    )
+    atualizar = text(
+        'UPDATE clientes SET email_normalizado = :email_normalizado, '
+        'cpf_normalizado = :cpf_normalizado WHERE id = :id_cliente'
+    )
+    ultimo = 0
+    while True:
+        linhas = conn.execute(selecionar, {'ultimo': ultimo, 'limite': LOTE_BACKFILL}).all()
+        if not linhas:
+            break
+        conn.execute(atualizar, [
+            {
+                'id_cliente': linha.id,
+                'email_normalizado': Cliente.normalizar_email(linha.email),
+                'cpf_normalizado': Cliente.normalizar_cpf(linha.cpf)
+            }
+            for linha in linhas
+        ])
+        ultimo = linhas[-1].id
+
+    _exigir_nao_nulo(conn, 'clientes', 'email_normalizado', 'VARCHAR(100)')
+    _exigir_nao_nulo(conn, 'clientes', 'cpf_normalizado', 'VARCHAR(11)')
+    _criar_indice(conn, 'clientes', 'ix_clientes_email_normalizado', ['email_normalizado'], unico=True)
+    _criar_indice(conn, 'clientes', 'ix_clientes_cpf_normalizado', ['cpf_normalizado'], unico=True)
+
+
+def indice_termos_nome(conn):
+    """
+    Tabela clientes_termos (índice invertido de nomes) e carga dos clientes ainda sem termos
+    (a tabela pode existir vazia, criada por create_all num banco com clientes)
+    """
+    if not inspect(conn).has_table('clientes_termos'):
+        ClienteTermo.__table__.create(conn)
+    elif conn.dialect.name == 'mysql':
+        # Tabelas criadas antes da collation binária herdaram a do banco
+        termo = next(c for c in inspect(conn).get_columns('clientes_termos') if c['name'] == 'termo')
+        if getattr(termo['type'], 'collation', None) != 'ascii_bin':
+            conn.execute(text(
+                f'ALTER TABLE clientes_termos MODIFY termo VARCHAR({ClienteTermo.TAMANHO_TERMO}) '
+                'CHARACTER SET ascii COLLATE ascii_bin NOT NULL'
+            ))
+
+    selecionar = text(
+        'SELECT c.id, c.nome FROM clientes c WHERE c.id > :ultimo AND NOT EXISTS '
+        '(SELECT 1 FROM clientes_termos t WHERE t.cliente_id = c.id) ORDER BY c.id LIMIT :limite'
+    )
+    ultimo = 0
+    while True:
+        linhas = conn.execute(selecionar, {'ultimo': ultimo, 'limite': LOTE_BACKFILL}).all()
+        if not linhas:
+            break
+        termos = [
+            {'termo': termo, 'cliente_id': linha.id}
+            for linha in linhas
+            for termo in Cliente.tokenizar_nome(linha.nome)
+        ]
+        if termos:
+            conn.execute(ClienteTermo.__table__.insert(), termos)
+        ultimo = linhas[-1].id
+
+
+def cadastros_diarios(conn):
+    """
+    Índice em data_cadastro e tabela de totais diários de cadastro, recalculada
+    quando a soma dos totais não bate com os clientes (ex.: tabela criada vazia
+    por create_all num banco com clientes)
+    """
+    _criar_indice(conn, 'clientes', 'ix_clientes_data_cadastro', ['data_cadastro'])
+    if not inspect(conn).has_table('clientes_cadastros_diarios'):
+        ClienteCadastroDiario.__table__.create(conn)
+    esperado = conn.execute(text('SELECT COUNT(*) FROM clientes WHERE data_cadastro IS NOT NULL')).scalar()
+    atual = conn.execute(text('SELECT COALESCE(SUM(total), 0) FROM clientes_cadastros_diarios')).scalar()
+    if int(atual) == esperado:
+        return
+    conn.execute(text('DELETE FROM clientes_cadastros_diarios'))
+    conn.execute(text(
+        'INSERT INTO clientes_cadastros_diarios (dia, total) '
+        'SELECT DATE(data_cadastro), COUNT(*) FROM clientes '
+        'WHERE data_cadastro IS NOT NULL GROUP BY DATE(data_cadastro)'
+    ))
+
+
+def versao_cliente(conn):
+    """Coluna versao (concorrência otimista), 1 para as linhas existentes"""
+    if 'versao' not in _colunas(conn, 'clientes'):
+        conn.execute(text('ALTER TABLE clientes ADD COLUMN versao INTEGER NOT NULL DEFAULT 1'))
+
+
+def indice_data_atualizacao(conn):
+    """Índice em data_atualizacao (versão da coleção para requisições condicionais)"""
+    _criar_indice(conn, 'clientes', 'ix_clientes_data_atualizacao', ['data_atualizacao'])
+
+
+def sequencia_clientes(conn):
+    """Tabela clientes_sequencia (contador de alterações, versão da coleção) com sua linha única"""
+    if not inspect(conn).has_table('clientes_sequencia'):
+        ClienteSequencia.__table__.create(conn)
+
+
+def exclusoes_clientes(conn):
+    """Tabela clientes_exclusoes (exclusões para o feed de alterações); começa vazia"""
+    if not inspect(conn).has_table('clientes_exclusoes'):
+        ClienteExclusao.__table__.create(conn)
+
+
+def sequencia_feed(conn):
+    """Coluna seq_alteracao (posição no feed de alterações), 0 nas linhas existentes"""
+    for tabela in ('clientes', 'clientes_exclusoes'):
+        if 'seq_alteracao' not in _colunas(conn, tabela):
+            conn.execute(text(f'ALTER TABLE {tabela} ADD COLUMN seq_alteracao BIGINT NOT NULL DEFAULT 0'))
+        _criar_indice(conn, tabela, f'ix_{tabela}_seq_alteracao', ['seq_alteracao'])
+
+
+# Migrações em ordem; cada uma verifica o estado do banco e pode ser reexecutada
+MIGRACOES = [
+    ('normalizar_email_cpf', normalizar_email_cpf),
+    ('indice_termos_nome', indice_termos_nome),
+    ('cadastros_diarios', cadastros_diarios),
+    ('versao_cliente', versao_cliente),
+    ('indice_data_atualizacao', indice_data_atualizacao),
+    ('sequencia_clientes', sequencia_clientes),
+    ('exclusoes_clientes', exclusoes_clientes),
+    ('sequencia_feed', sequencia_feed),
+]
+
+
+def aplicar_migracoes():
+    """Aplica as migrações pendentes, cada uma em sua transação; retorna os nomes executados"""
+    engine = get_engine()
+    executadas = []
+    # Banco novo: init-db já cria o esquema atual completo
+    if not inspect(engine).has_table('clientes'):
+        return executadas
+
+    for nome, migracao in MIGRACOES:
+        with engine.begin() as conn:
+            migracao(conn)
+        executadas.append(nome)
+    return executadas
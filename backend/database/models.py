@@ -1,40 +1,96 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker, scoped_session
 from models.cliente import Cliente, Base
-import os
-from dotenv import load_dotenv
-from urllib.parse import quote_plus
+from database.conn import get_engine, conectar_leitura, get_roteador_leitura
+
+
+def criar_tabelas():
+    """Cria as tabelas que ainda não existem (comando explícito, não roda na importação)"""
+    Base.metadata.create_all(get_engine())
+
+
+# Marca a sessão ao enviar escritas (flush do ORM ou INSERT/UPDATE/DELETE explícitos)
+def _marcar_escrita(session, flush_context):
+    session.info['escreveu'] = True
+
+
+def _marcar_escrita_dml(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info['escreveu'] = True
 
-load_dotenv()
 
 class DatabaseManager:
     def __init__(self):
-        host = os.getenv('DB_HOST')
-        db = os.getenv('DB_NAME')
-        user = os.getenv('DB_USER')
-        password = quote_plus(os.getenv('DB_PASSWORD'))
-        port = int(os.getenv('DB_PORT'))
-        
-        url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{db}"
-        
-        self.engine = create_engine(
-            url,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True,
-            echo=True
-        )
-        
-        # Cria as tabelas
-        Base.metadata.create_all(self.engine)
-        
-        # Cria sessão
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        self._Session = None
+        self._SessionLeitura = None
+        self._lock = threading.Lock()
+    
+    @property
+    def engine(self):
+        return get_engine()
+    
+    def conectar_leitura(self):
+        """Conexão avulsa de leitura (réplica saudável ou primário); quem chama a fecha"""
+        return conectar_leitura()
+    
+    @property
+    def Session(self):
+        """Registro de sessões: uma sessão por thread, criado no primeiro acesso"""
+        if self._Session is None:
+            with self._lock:
+                if self._Session is None:
+                    fabrica = sessionmaker(bind=self.engine)
+                    event.listen(fabrica, 'after_flush', _marcar_escrita)
+                    event.listen(fabrica, 'do_orm_execute', _marcar_escrita_dml)
+                    self._Session = scoped_session(fabrica)
+        return self._Session
+    
+    @property
+    def SessionLeitura(self):
+        """
+        Registro de sessões de leitura: cada sessão usa a conexão obtida ao criá-la,
+        então a réplica (ou o primário, se nenhuma responder) é fixa durante a requisição
+        """
+        if self._SessionLeitura is None:
+            with self._lock:
+                if self._SessionLeitura is None:
+                    fabrica = sessionmaker()
+                    
+                    def nova_sessao():
+                        conexao = conectar_leitura()
+                        return fabrica(bind=conexao, info={'conexao': conexao})
+                    
+                    self._SessionLeitura = scoped_session(nova_sessao)
+        return self._SessionLeitura
     
     def get_session(self):
-        return self.session
+        """Retorna a sessão da requisição (thread) atual"""
+        return self.Session()
+    
+    def get_session_leitura(self):
+        """
+        Sessão para consultas somente leitura: numa réplica, se houver (DB_REPLICAS).
+        Se a requisição já escreveu no primário, continua nele para ler as próprias escritas.
+        """
+        if get_roteador_leitura() is None or self.escreveu():
+            return self.get_session()
+        return self.SessionLeitura()
+    
+    def escreveu(self):
+        """Indica se a sessão primária da requisição atual já enviou alguma escrita"""
+        if self._Session is None or not self._Session.registry.has():
+            return False
+        return self._Session().info.get('escreveu', False)
+    
+    def remove(self):
+        """Fecha e descarta as sessões da thread atual (fim da requisição)"""
+        if self._Session is not None:
+            self._Session.remove()
+        if self._SessionLeitura is not None and self._SessionLeitura.registry.has():
+            conexao = self._SessionLeitura().info['conexao']
+            self._SessionLeitura.remove()
+            conexao.close()
     
     def close(self):
-        self.session.close()
\ No newline at end of file
+        self.remove()
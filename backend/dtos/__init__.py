@@ -1,4 +1,4 @@
 # dtos/__init__.py
-from .cliente_dto import RegistrarClienteDTO, ClienteResponseDTO, AtualizarClienteDTO
+from .cliente_dto import RegistrarClienteDTO, ClienteResponseDTO, AtualizarClienteDTO, CAMPOS_RESPOSTA, serializar_linhas
 
-__all__ = ['RegistrarClienteDTO', 'ClienteResponseDTO', 'AtualizarClienteDTO']
\ No newline at end of file
+__all__ = ['RegistrarClienteDTO', 'ClienteResponseDTO', 'AtualizarClienteDTO', 'CAMPOS_RESPOSTA', 'serializar_linhas']
\ No newline at end of file
@@ -1,18 +1,136 @@
 # dtos/cliente_dto.py
-from datetime import datetime
-from typing import Optional, Dict, Any
+import re
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterable, List, Sequence
+from models.cliente import Cliente
+
+# Campos expostos na resposta, na ordem em que são serializados
+CAMPOS_RESPOSTA = (
+    'id', 'nome', 'email', 'telefone', 'cpf',
+    'data_nascimento', 'data_cadastro', 'data_atualizacao', 'versao'
+)
+
+# Campos de data e o formato de saída (isoformat equivale aos strftime do DTO, mais rápido)
+_FORMATADORES_DATA = {
+    'data_nascimento': lambda valor: valor.isoformat(),
+    'data_cadastro': lambda valor: valor.isoformat(' ', 'seconds'),
+    'data_atualizacao': lambda valor: valor.isoformat(' ', 'seconds'),
+}
+# Só datas de nascimento se repetem o bastante para compensar a memorização;
+# data_cadastro/data_atualizacao têm microssegundos e são quase todas distintas
+_DATAS_MEMORIZADAS = {'data_nascimento'}
+
+
+def serializar_linhas(linhas: Iterable[Sequence[Any]], campos: Sequence[str] = CAMPOS_RESPOSTA) -> List[Dict[str, Any]]:
+    """
+    Caminho rápido para listas: converte linhas (tuplas com os valores na ordem
+    de campos; colunas extras no fim são ignoradas) direto em dicts, sem DTO
+    intermediário. Cada data de nascimento distinta é formatada uma única vez por chamada.
+    """
+    campos = tuple(campos)
+    datas = [
+        (campo, _FORMATADORES_DATA[campo], {} if campo in _DATAS_MEMORIZADAS else None)
+        for campo in campos if campo in _FORMATADORES_DATA
+    ]
+    resultado = []
+    for linha in linhas:
+        dados = dict(zip(campos, linha))
+        for campo, formatar, formatadas in datas:
+            valor = dados[campo]
+            if valor is None:
+                continue
+            if formatadas is None:
+                dados[campo] = formatar(valor)
+                continue
+            texto = formatadas.get(valor)
+            if texto is None:
+                texto = formatadas[valor] = formatar(valor)
+            dados[campo] = texto
+        resultado.append(dados)
+    return resultado
+
+
+# Regras de validação, compiladas na importação; nenhuma delas acessa o banco
+TAMANHO_MAXIMO_NOME = 100
+TAMANHO_MAXIMO_EMAIL = 100
+TAMANHO_MINIMO_SENHA = 6
+_RE_EMAIL = re.compile(r"[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?)+")
+_RE_CPF = re.compile(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}')
+_RE_TELEFONE = re.compile(r'[\d\s()+-]+')
+_RE_DATA = re.compile(r'\d{4}-\d{2}-\d{2}')
+_RE_NAO_DIGITO = re.compile(r'\D')
+
+
+def _texto(valor: Any) -> str:
+    """Valor recebido como texto sem espaços nas pontas ('' se ausente)"""
+    return '' if valor is None else str(valor).strip()
+
+
+def _erro_nome(nome: str) -> Optional[str]:
+    if len(nome) > TAMANHO_MAXIMO_NOME:
+        return f'Nome deve ter no máximo {TAMANHO_MAXIMO_NOME} caracteres!'
+    return None
+
+
+def _erro_email(email: str) -> Optional[str]:
+    if len(email) > TAMANHO_MAXIMO_EMAIL or not _RE_EMAIL.fullmatch(email):
+        return 'Email inválido!'
+    return None
+
+
+def _erro_telefone(telefone: str) -> Optional[str]:
+    if not _RE_TELEFONE.fullmatch(telefone) or len(_RE_NAO_DIGITO.sub('', telefone)) not in (10, 11):
+        return 'Telefone deve ter DDD e 8 ou 9 dígitos!'
+    return None
+
+
+def _erro_cpf(cpf: str) -> Optional[str]:
+    if not _RE_CPF.fullmatch(cpf) or not Cliente.validar_cpf(cpf):
+        return 'CPF inválido!'
+    return None
+
+
+def _erro_data(data: str) -> Optional[str]:
+    if not _RE_DATA.fullmatch(data):
+        return 'Data de nascimento deve estar no formato AAAA-MM-DD!'
+    try:
+        nascimento = date.fromisoformat(data)
+    except ValueError:
+        return 'Data de nascimento inválida!'
+    if nascimento.year < 1900 or nascimento > date.today():
+        return 'Data de nascimento inválida!'
+    return None
+
+
+def _aplicar_regras(valores: Dict[str, str], regras, obrigatorios: bool) -> Dict[str, str]:
+    """Uma passada pelas regras; campos vazios são erro se obrigatórios, senão ignorados"""
+    erros = {}
+    for campo, regra in regras:
+        valor = valores[campo]
+        if not valor:
+            if obrigatorios:
+                erros[campo] = f'Campo {campo} é obrigatório!'
+            continue
+        if regra is not None:
+            erro = regra(valor)
+            if erro:
+                erros[campo] = erro
+    return erros
+
 
 class RegistrarClienteDTO:
     """DTO para receber dados do formulário de cadastro"""
     
+    CAMPOS_OBRIGATORIOS = ('email', 'name', 'number', 'cpf', 'data', 'password', 'password_c')
+    
     def __init__(self, dados: Dict[str, Any]):
-        self.email = dados.get('email', '').strip()
-        self.nome = dados.get('name', '').strip()
-        self.telefone = dados.get('number', '').strip()
-        self.cpf = dados.get('cpf', '').strip()
-        self.data_nascimento = dados.get('data', '')
-        self.senha = dados.get('password', '')
-        self.senha_c = dados.get('password_c', '')
+        self.email = _texto(dados.get('email'))
+        self.nome = _texto(dados.get('name'))
+        self.telefone = _texto(dados.get('number'))
+        self.cpf = _texto(dados.get('cpf'))
+        self.data_nascimento = _texto(dados.get('data'))
+        self.senha = dados.get('password') or ''
+        self.senha_c = dados.get('password_c') or ''
     
     def validar_senhas(self) -> bool:
         """Valida se as senhas coincidem"""
@@ -22,6 +140,35 @@ class RegistrarClienteDTO:
         """Valida tamanho mínimo da senha"""
         return len(self.senha) >= minimo
     
+    # Campo do formulário -> regra (None: só obrigatório), na ordem dos CAMPOS_OBRIGATORIOS
+    REGRAS = (
+        ('email', _erro_email),
+        ('name', _erro_nome),
+        ('number', _erro_telefone),
+        ('cpf', _erro_cpf),
+        ('data', _erro_data),
+        ('password', None),
+        ('password_c', None),
+    )
+    
+    def erros(self) -> Dict[str, str]:
+        """
+        Valida todos os campos de uma vez, sem acessar o banco
+        Returns:
+            dict {campo do formulário: mensagem}; vazio se o cadastro é válido
+        """
+        valores = {
+            'email': self.email, 'name': self.nome, 'number': self.telefone,
+            'cpf': self.cpf, 'data': self.data_nascimento,
+            'password': self.senha, 'password_c': self.senha_c
+        }
+        erros = _aplicar_regras(valores, self.REGRAS, obrigatorios=True)
+        if 'password' not in erros and not self.validar_senha_tamanho(TAMANHO_MINIMO_SENHA):
+            erros['password'] = f'Senha deve ter no mínimo {TAMANHO_MINIMO_SENHA} caracteres!'
+        if 'password' not in erros and 'password_c' not in erros and not self.validar_senhas():
+            erros['password_c'] = 'As senhas não coincidem!'
+        return erros
+    
     def to_dict(self) -> Dict[str, Any]:
         """Converte DTO para dicionário (remove senha_c)"""
         return {
@@ -37,41 +184,69 @@ class RegistrarClienteDTO:
         return f"<RegistrarClienteDTO(email='{self.email}', nome='{self.nome}')>"
 
 
+def validar_lote(registros: Sequence[Any]) -> List[Dict[str, str]]:
+    """
+    Valida vários cadastros sem acessar o banco
+    Returns:
+        lista alinhada aos registros com os erros de cada um (dict vazio se válido)
+    """
+    return [
+        RegistrarClienteDTO(registro).erros() if isinstance(registro, dict)
+        else {'registro': 'Registro deve ser um objeto!'}
+        for registro in registros
+    ]
+
+
 class ClienteResponseDTO:
     """DTO para enviar dados do cliente na resposta"""
     
-    def __init__(self, cliente):
-        self.id = cliente.id
-        self.nome = cliente.nome
-        self.email = cliente.email
-        self.telefone = cliente.telefone
-        self.cpf = cliente.cpf
-        self.data_nascimento = cliente.data_nascimento
-        self.data_cadastro = cliente.data_cadastro
-        self.data_atualizacao = cliente.data_atualizacao
+    __slots__ = ('campos',) + CAMPOS_RESPOSTA
+    
+    def __init__(self, cliente, campos: Optional[Iterable[str]] = None):
+        """
+        cliente: objeto Cliente ou linha com os atributos selecionados
+        campos: subconjunto de CAMPOS_RESPOSTA a serializar (todos se None)
+        """
+        self.campos = tuple(campos) if campos else CAMPOS_RESPOSTA
+        for campo in self.campos:
+            setattr(self, campo, getattr(cliente, campo))
     
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário serializável"""
-        return {
-            'id': self.id,
-            'nome': self.nome,
-            'email': self.email,
-            'telefone': self.telefone,
-            'cpf': self.cpf,
-            'data_nascimento': self.data_nascimento.strftime('%Y-%m-%d') if self.data_nascimento else None,
-            'data_cadastro': self.data_cadastro.strftime('%Y-%m-%d %H:%M:%S') if self.data_cadastro else None,
-            'data_atualizacao': self.data_atualizacao.strftime('%Y-%m-%d %H:%M:%S') if self.data_atualizacao else None
-        }
+        dados = {campo: getattr(self, campo) for campo in self.campos}
+        if 'data_nascimento' in dados:
+            dados['data_nascimento'] = self.data_nascimento.strftime('%Y-%m-%d') if self.data_nascimento else None
+        if 'data_cadastro' in dados:
+            dados['data_cadastro'] = self.data_cadastro.strftime('%Y-%m-%d %H:%M:%S') if self.data_cadastro else None
+        if 'data_atualizacao' in dados:
+            dados['data_atualizacao'] = self.data_atualizacao.strftime('%Y-%m-%d %H:%M:%S') if self.data_atualizacao else None
+        return dados
 
 
 class AtualizarClienteDTO:
     """DTO para atualização de cliente"""
     
+    # Todos opcionais: só os campos enviados são validados
+    REGRAS = (
+        ('nome', _erro_nome),
+        ('email', _erro_email),
+        ('telefone', _erro_telefone),
+        ('data_nascimento', _erro_data),
+    )
+    
     def __init__(self, dados: Dict[str, Any]):
-        self.nome = dados.get('nome')
-        self.email = dados.get('email')
-        self.telefone = dados.get('telefone')
-        self.data_nascimento = dados.get('data_nascimento')
+        self.nome = _texto(dados.get('nome')) or None
+        self.email = _texto(dados.get('email')) or None
+        self.telefone = _texto(dados.get('telefone')) or None
+        self.data_nascimento = _texto(dados.get('data_nascimento')) or None
+    
+    def erros(self) -> Dict[str, str]:
+        """Valida os campos enviados, sem acessar o banco; dict vazio se válidos"""
+        valores = {
+            'nome': self.nome, 'email': self.email,
+            'telefone': self.telefone, 'data_nascimento': self.data_nascimento
+        }
+        return _aplicar_regras(valores, self.REGRAS, obrigatorios=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Retorna apenas campos não nulos"""
@@ -0,0 +1,59 @@
+# gunicorn.conf.py - servidor de produção com N processos (pre-fork)
+# Uso: gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('WEB_THREADS', 4))
+
+# Pool de bcrypt por worker (lido quando o app é importado): com um processo
+# por núcleo, uma thread de hash por worker já ocupa todos os núcleos, e a capacidade
+# (executando + fila) fica abaixo de threads, para que cadastros não tomem todas as
+# threads do worker e as leituras sigam sendo atendidas; acima disso, 503
+os.environ.setdefault('HASH_WORKERS', '1')
+os.environ.setdefault('HASH_FILA', str(max(threads - 2, 0)))
+
+# O cache de clientes é local de cada worker e a invalidação não chega aos demais:
+# com vários processos, validade curta limita por quanto tempo um dado antigo é servido
+if workers > 1:
+    os.environ.setdefault('CACHE_TTL', '5')
+
+# O app é importado uma vez no master e herdado pelos workers via fork.
+# Isso é seguro porque a importação não abre conexões nem threads; ainda assim,
+# post_fork descarta qualquer pool/pool de threads herdado do master.
+preload_app = True
+
+# Cada worker grava suas métricas aqui e GET /metrics soma as de todos
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f'clientes-metricas-{os.getpid()}'))
+
+
+def on_starting(server):
+    # Instantâneos de uma execução anterior não entram na soma
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+
+
+def post_fork(server, worker):
+    from database.conn import reiniciar_apos_fork
+    from services.hash_service import servico_hash
+    from services.metrics_service import metricas
+    reiniciar_apos_fork()
+    servico_hash.reiniciar_apos_fork()
+    metricas.reiniciar_apos_fork()
+
+
+def worker_exit(server, worker):
+    # Termina os hashes em andamento; depois, os contadores do worker que sai
+    # continuam somados em /metrics
+    from services.hash_service import servico_hash
+    from services.metrics_service import metricas
+    servico_hash.encerrar()
+    metricas.gravar()
+
+
+def on_exit(server):
+    from database.conn import dispose_engine
+    dispose_engine()
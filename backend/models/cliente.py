@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, DDL, event
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import validates
 from datetime import datetime
+import re
+import unicodedata
 
 Base = declarative_base()
 
@@ -12,20 +16,67 @@ class Cliente(Base):
     email = Column(String(100), nullable=False, unique=True)
     telefone = Column(String(20), nullable=False)
     cpf = Column(String(14), nullable=False, unique=True)
+    # Colunas de busca: email em minúsculas e CPF só com dígitos
+    email_normalizado = Column(String(100), nullable=False, unique=True, index=True)
+    cpf_normalizado = Column(String(11), nullable=False, unique=True, index=True)
     data_nascimento = Column(Date, nullable=False)
     senha_hash = Column(String(255), nullable=False)
-    data_cadastro = Column(DateTime, default=datetime.now)
-    data_atualizacao = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    data_cadastro = Column(DateTime, default=datetime.now, index=True)
+    data_atualizacao = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
+    # Versão para concorrência otimista: toda escrita a incrementa; só o PATCH a exige
+    # (UPDATE ... WHERE versao = ?), o PUT segue como última escrita vence
+    versao = Column(Integer, nullable=False, default=1)
+    # Posição no feed de alterações: valor do contador (ClienteSequencia) na última escrita;
+    # 0 nas linhas anteriores ao contador
+    seq_alteracao = Column(BigInteger, nullable=False, default=0, index=True)
     
     def __repr__(self):
         return f"<Cliente(nome='{self.nome}', email='{self.email}')>"
     
+    @validates('email')
+    def _atualizar_email_normalizado(self, chave, email):
+        self.email_normalizado = Cliente.normalizar_email(email)
+        return email
+    
+    @validates('cpf')
+    def _atualizar_cpf_normalizado(self, chave, cpf):
+        self.cpf_normalizado = Cliente.normalizar_cpf(cpf)
+        return cpf
+    
+    @staticmethod
+    def normalizar_email(email):
+        """Email na forma usada para unicidade e busca"""
+        return email.strip().lower()
+    
+    @staticmethod
+    def normalizar_cpf(cpf):
+        """CPF só com dígitos, forma usada para unicidade e busca"""
+        return ''.join(filter(str.isdigit, cpf))
+    
+    @staticmethod
+    def normalizar_termo(texto):
+        """Minúsculas e sem acentos: 'Conceição' -> 'conceicao'"""
+        decomposto = unicodedata.normalize('NFKD', texto.lower())
+        return ''.join(c for c in decomposto if not unicodedata.combining(c))
+    
+    @staticmethod
+    def tokenizar_nome(nome):
+        """Termos distintos do nome, normalizados, para o índice de busca"""
+        termos = re.findall(r'[a-z0-9]+', Cliente.normalizar_termo(nome or ''))
+        return list(dict.fromkeys(termo[:ClienteTermo.TAMANHO_TERMO] for termo in termos))
+    
     @staticmethod
     def validar_cpf(cpf):
-        """Validação básica de CPF"""
+        """Valida CPF: 11 dígitos, não todos iguais, e os dois dígitos verificadores"""
         cpf = ''.join(filter(str.isdigit, cpf))
-        if len(cpf) != 11:
+        if len(cpf) != 11 or cpf == cpf[0] * 11:
             return False
+        digitos = [int(digito) for digito in cpf]
+        # 1º verificador: pesos 10..2 sobre 9 dígitos; 2º: pesos 11..2 sobre 10 dígitos
+        for posicao in (9, 10):
+            soma = sum(digito * peso for digito, peso in zip(digitos, range(posicao + 1, 1, -1)))
+            if digitos[posicao] != soma * 10 % 11 % 10:
+                return False
         return True
     
     @staticmethod
@@ -44,4 +95,71 @@ class Cliente(Base):
         cpf = ''.join(filter(str.isdigit, cpf))
         if len(cpf) == 11:
             return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
-        return cpf
\ No newline at end of file
+        return cpf
+
+
+class ClienteTermo(Base):
+    """Índice invertido do nome: um termo normalizado por linha, buscado por prefixo"""
+    __tablename__ = 'clientes_termos'
+    
+    TAMANHO_TERMO = 50
+    
+    # Comparação binária: a busca por prefixo é o intervalo [termo, termo com a última
+    # letra + 1), e as collations padrão do MySQL põem pontuação antes das letras
+    termo = Column(
+        String(TAMANHO_TERMO).with_variant(
+            mysql.VARCHAR(TAMANHO_TERMO, charset='ascii', collation='ascii_bin'), 'mysql'
+        ),
+        primary_key=True
+    )
+    cliente_id = Column(Integer, primary_key=True, index=True)
+    
+    def __repr__(self):
+        return f"<ClienteTermo(termo='{self.termo}', cliente_id={self.cliente_id})>"
+
+
+class ClienteCadastroDiario(Base):
+    """Total de cadastros por dia, mantido a cada inserção/exclusão de cliente"""
+    __tablename__ = 'clientes_cadastros_diarios'
+    
+    dia = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ClienteCadastroDiario(dia='{self.dia}', total={self.total})>"
+
+
+class ClienteExclusao(Base):
+    """Registro de exclusão (tombstone) para o feed de alterações"""
+    __tablename__ = 'clientes_exclusoes'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cliente_id = Column(Integer, nullable=False)
+    data_exclusao = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    seq_alteracao = Column(BigInteger, nullable=False, default=0, index=True)
+    
+    def __repr__(self):
+        return f"<ClienteExclusao(cliente_id={self.cliente_id}, data_exclusao='{self.data_exclusao}')>"
+
+
+class ClienteSequencia(Base):
+    """
+    Contador de alterações da tabela clientes (linha única, id 1).
+    Toda transação de escrita o incrementa antes de qualquer outra escrita,
+    então o valor muda a cada cadastro, alteração ou exclusão. Como a linha fica
+    bloqueada até o commit, os valores são confirmados em ordem crescente.
+    """
+    __tablename__ = 'clientes_sequencia'
+    
+    id = Column(Integer, primary_key=True)
+    valor = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ClienteSequencia(valor={self.valor})>"
+
+
+# A linha do contador nasce com a tabela (create_all ou migração)
+event.listen(
+    ClienteSequencia.__table__, 'after_create',
+    DDL('INSERT INTO clientes_sequencia (id, valor) VALUES (1, 0)')
+)
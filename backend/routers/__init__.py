@@ -1,4 +1,5 @@
 # routers/__init__.py
 from .cliente_router import cliente_bp
+from .metrics_router import metrics_bp
 
-__all__ = ['cliente_bp']
\ No newline at end of file
+__all__ = ['cliente_bp', 'metrics_bp']
\ No newline at end of file
@@ -1,38 +1,77 @@
 # routers/cliente_router.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+import json
+import time
 from controllers.cliente_controller import ClienteController
 from dtos.cliente_dto import RegistrarClienteDTO, AtualizarClienteDTO
+from services.hash_service import ServicoSaturadoError
+from routers.comum import (
+    STATUS_FALHA_ATUALIZACAO, ler_campos, resposta_invalida, gerar_etag, validadores_cliente,
+    versao_if_match, nao_modificado, aplicar_validadores
+)
+from services.metrics_service import metricas, iniciar_requisicao, finalizar_requisicao
 
 cliente_bp = Blueprint('clientes', __name__, url_prefix='/api/clientes')
 cliente_controller = ClienteController()
 
+@cliente_bp.before_request
+def iniciar_metricas():
+    iniciar_requisicao()
+
+@cliente_bp.after_request
+def registrar_metricas(resposta):
+    contexto = finalizar_requisicao()
+    if contexto is None:
+        return resposta
+    
+    duracao = time.perf_counter() - contexto['inicio']
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    metricas.observar(
+        'http_request_duration_seconds', 'Duração das requisições HTTP por rota',
+        duracao, method=request.method, route=rota, status=resposta.status_code
+    )
+    metricas.observar(
+        'http_request_db_queries', 'Consultas SQL por requisição',
+        contexto['sql_total'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100), route=rota
+    )
+    
+    if current_app.config.get('SERVER_TIMING'):
+        resposta.headers['Server-Timing'] = ', '.join([
+            f'db;dur={contexto["sql_segundos"] * 1000:.2f};desc="{contexto["sql_total"]} consultas"',
+            f'bcrypt;dur={contexto["bcrypt_segundos"] * 1000:.2f}',
+            f'total;dur={duracao * 1000:.2f}'
+        ])
+    return resposta
+
+@cliente_bp.teardown_app_request
+def encerrar_sessao(exc):
+    cliente_controller.encerrar_sessao()
+
+@cliente_bp.errorhandler(ServicoSaturadoError)
+def servico_saturado(e):
+    resposta = jsonify({'success': False, 'message': str(e)})
+    resposta.headers['Retry-After'] = str(e.retry_after)
+    return resposta, 503
+
+def _resposta_cliente(resultado):
+    """200 com validadores, 304 se o cliente do requisitante ainda vale, ou 404"""
+    if not (resultado['success'] and resultado['cliente']):
+        return jsonify({'success': False, 'message': 'Cliente não encontrado!'}), 404
+    
+    cliente = resultado['cliente']
+    etag, ultima_modificacao = validadores_cliente(cliente['id'], cliente['versao'], cliente['data_atualizacao'])
+    if nao_modificado(request, etag, ultima_modificacao):
+        return aplicar_validadores(Response(status=304), etag, ultima_modificacao)
+    return aplicar_validadores(jsonify(resultado), etag, ultima_modificacao)
+
 @cliente_bp.route('', methods=['POST'])
 def cadastrar_cliente():
     try:
-        # Valida campos obrigatórios
-        campos_obrigatorios = ['email', 'name', 'number', 'cpf', 'data', 'password', 'password_c']
-        for campo in campos_obrigatorios:
-            if not request.form.get(campo):
-                return jsonify({
-                    'success': False,
-                    'message': f'Campo {campo} é obrigatório!'
-                }), 400
-        
-        # Cria DTO com os dados do formulário
+        # Cria DTO com os dados do formulário e valida tudo antes de tocar no banco
         cliente_dto = RegistrarClienteDTO(request.form)
-        
-        # Validações
-        if not cliente_dto.validar_senha_tamanho():
-            return jsonify({
-                'success': False,
-                'message': 'Senha deve ter no mínimo 6 caracteres!'
-            }), 400
-        
-        if not cliente_dto.validar_senhas():
-            return jsonify({
-                'success': False,
-                'message': 'As senhas não coincidem!'
-            }), 400
+        erros = cliente_dto.erros()
+        if erros:
+            return resposta_invalida(erros)
         
         # Chama o controller com os dados do DTO
         resultado = cliente_controller.cadastrar_cliente(cliente_dto.to_dict())
@@ -40,6 +79,34 @@ def cadastrar_cliente():
         status_code = 201 if resultado['success'] else 400
         return jsonify(resultado), status_code
             
+    except ServicoSaturadoError:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro no servidor: {str(e)}'
+        }), 500
+
+@cliente_bp.route('/bulk', methods=['POST'])
+def cadastrar_clientes_lote():
+    try:
+        # Aceita um array JSON ou NDJSON (um objeto por linha)
+        if request.mimetype == 'application/x-ndjson':
+            linhas = request.get_data(as_text=True).splitlines()
+            registros = [json.loads(linha) for linha in linhas if linha.strip()]
+        else:
+            registros = request.get_json(silent=True)
+        
+        if not isinstance(registros, list):
+            return jsonify({
+                'success': False,
+                'message': 'Envie uma lista de clientes em JSON ou NDJSON!'
+            }), 400
+        
+        resultado = cliente_controller.cadastrar_clientes_lote(registros)
+        return jsonify(resultado), 201 if resultado['success'] else 400
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'JSON inválido: {str(e)}'}), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -48,15 +115,110 @@ def cadastrar_cliente():
 
 @cliente_bp.route('', methods=['GET'])
 def listar_clientes():
-    resultado = cliente_controller.listar_clientes()
+    # A versão da coleção é lida antes da página: se mudar no meio, o ETag enviado
+    # fica para trás e a próxima revalidação recebe 200 com os dados novos
+    versao = cliente_controller.versao_colecao()
+    etag = gerar_etag(versao['total'], versao['sequencia'], request.query_string.decode())
+    if nao_modificado(request, etag):
+        return aplicar_validadores(Response(status=304), etag)
+    
+    resultado = cliente_controller.listar_clientes(
+        limite=request.args.get('limit'),
+        cursor=request.args.get('cursor'),
+        campos=ler_campos(request),
+        ordenacao=request.args.get('sort', 'id')
+    )
+    if not resultado['success']:
+        return jsonify(resultado), 400
+    return aplicar_validadores(jsonify(resultado), etag)
+
+@cliente_bp.route('/batch-get', methods=['POST'])
+def buscar_clientes_lote():
+    dados = request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return jsonify({'success': False, 'message': 'Envie um objeto JSON com ids, emails ou cpfs!'}), 400
+    
+    resultado = cliente_controller.buscar_clientes_lote(
+        ids=dados.get('ids'),
+        emails=dados.get('emails'),
+        cpfs=dados.get('cpfs'),
+        campos=dados.get('fields')
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp.route('/export', methods=['GET'])
+def exportar_clientes():
+    formato = request.args.get('format', 'ndjson')
+    try:
+        gerador = cliente_controller.exportar_clientes(
+            formato=formato,
+            campos=ler_campos(request)
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(gerador),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=clientes.{formato}'}
+    )
+
+@cliente_bp.route('/changes', methods=['GET'])
+def listar_alteracoes():
+    resultado = cliente_controller.listar_alteracoes(
+        cursor=request.args.get('since'),
+        limite=request.args.get('limit'),
+        campos=ler_campos(request)
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp.route('/search', methods=['GET'])
+def buscar_por_nome():
+    resultado = cliente_controller.buscar_por_nome(
+        request.args.get('q', ''),
+        limite=request.args.get('limit'),
+        offset=request.args.get('offset', 0),
+        campos=ler_campos(request)
+    )
     return jsonify(resultado), 200 if resultado['success'] else 400
 
+@cliente_bp.route('/stats', methods=['GET'])
+def estatisticas_cadastros():
+    agrupamentos = {'day': 'dia', 'month': 'mes'}
+    resultado = cliente_controller.estatisticas_cadastros(
+        data_inicio=request.args.get('start'),
+        data_fim=request.args.get('end'),
+        agrupamento=agrupamentos.get(request.args.get('group', 'day'), request.args.get('group'))
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp.route('/cache/stats', methods=['GET'])
+def estatisticas_cache():
+    return jsonify(cliente_controller.estatisticas_cache()), 200
+
 @cliente_bp.route('/<int:id>', methods=['GET'])
 def buscar_cliente(id):
+    # Revalidação: compara só versão e data de atualização, sem carregar o cliente
+    if request.if_none_match or request.if_modified_since:
+        validador = cliente_controller.validador_cliente(id)
+        if validador:
+            etag, ultima_modificacao = validadores_cliente(id, validador['versao'], validador['data_atualizacao'])
+            if nao_modificado(request, etag, ultima_modificacao):
+                return aplicar_validadores(Response(status=304), etag, ultima_modificacao)
+    
     resultado = cliente_controller.buscar_cliente(id=id)
-    if resultado['success'] and resultado['cliente']:
-        return jsonify(resultado), 200
-    return jsonify({'success': False, 'message': 'Cliente não encontrado!'}), 404
+    return _resposta_cliente(resultado)
+
+@cliente_bp.route('/by-cpf/<cpf>', methods=['GET'])
+def buscar_cliente_por_cpf(cpf):
+    resultado = cliente_controller.buscar_cliente(cpf=cpf)
+    return _resposta_cliente(resultado)
+
+@cliente_bp.route('/by-email/<email>', methods=['GET'])
+def buscar_cliente_por_email(email):
+    resultado = cliente_controller.buscar_cliente(email=email)
+    return _resposta_cliente(resultado)
 
 @cliente_bp.route('/<int:id>', methods=['PUT'])
 def atualizar_cliente(id):
@@ -64,12 +226,43 @@ def atualizar_cliente(id):
         # Cria DTO de atualização
         dados = request.json if request.is_json else request.form.to_dict()
         atualizar_dto = AtualizarClienteDTO(dados)
+        erros = atualizar_dto.erros()
+        if erros:
+            return resposta_invalida(erros)
         
         resultado = cliente_controller.atualizar_cliente(id, atualizar_dto.to_dict())
         return jsonify(resultado), 200 if resultado['success'] else 400
+    except ServicoSaturadoError:
+        raise
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@cliente_bp.route('/<int:id>', methods=['PATCH'])
+def atualizar_parcial(id):
+    dados = request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return jsonify({'success': False, 'message': 'Envie um objeto JSON!'}), 400
+    
+    # A versão pode vir no corpo ou no cabeçalho If-Match
+    versao = dados.get('versao', versao_if_match(request))
+    atualizar_dto = AtualizarClienteDTO(dados)
+    erros = atualizar_dto.erros()
+    if erros:
+        return resposta_invalida(erros)
+    resultado = cliente_controller.atualizar_parcial(id, versao, atualizar_dto.to_dict())
+    if resultado['success']:
+        return jsonify(resultado), 200
+    return jsonify(resultado), STATUS_FALHA_ATUALIZACAO.get(resultado.get('motivo'), 400)
+
+@cliente_bp.route('', methods=['PATCH'])
+def atualizar_parcial_lote():
+    itens = request.get_json(silent=True)
+    if not isinstance(itens, list):
+        return jsonify({'success': False, 'message': 'Envie uma lista de {id, versao, campos...}!'}), 400
+    
+    resultado = cliente_controller.atualizar_parcial_lote(itens)
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
 @cliente_bp.route('/<int:id>', methods=['DELETE'])
 def deletar_cliente(id):
     resultado = cliente_controller.deletar_cliente(id)
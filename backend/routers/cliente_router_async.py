@@ -0,0 +1,184 @@
+# routers/cliente_router_async.py
+from quart import Blueprint, Response, request, jsonify
+from controllers.cliente_controller_async import ClienteControllerAsync
+from dtos.cliente_dto import RegistrarClienteDTO, AtualizarClienteDTO
+from services.hash_service import ServicoSaturadoError
+from routers.comum import (
+    STATUS_FALHA_ATUALIZACAO, ler_campos, resposta_invalida, gerar_etag, validadores_cliente,
+    versao_if_match, nao_modificado, aplicar_validadores
+)
+
+cliente_bp_async = Blueprint('clientes', __name__, url_prefix='/api/clientes')
+cliente_controller_async = ClienteControllerAsync()
+
+@cliente_bp_async.errorhandler(ServicoSaturadoError)
+async def servico_saturado(e):
+    resposta = jsonify({'success': False, 'message': str(e)})
+    resposta.headers['Retry-After'] = str(e.retry_after)
+    return resposta, 503
+
+@cliente_bp_async.route('', methods=['POST'])
+async def cadastrar_cliente():
+    try:
+        # Cria DTO com os dados do formulário e aplica as mesmas validações da rota síncrona
+        cliente_dto = RegistrarClienteDTO(await request.form)
+        erros = cliente_dto.erros()
+        if erros:
+            return resposta_invalida(erros)
+        
+        resultado = await cliente_controller_async.cadastrar_cliente(cliente_dto.to_dict())
+        
+        status_code = 201 if resultado['success'] else 400
+        return jsonify(resultado), status_code
+    
+    except ServicoSaturadoError:
+        raise
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro no servidor: {str(e)}'
+        }), 500
+
+@cliente_bp_async.route('', methods=['GET'])
+async def listar_clientes():
+    # A versão da coleção é lida antes da página, como na rota síncrona
+    versao = await cliente_controller_async.versao_colecao()
+    etag = gerar_etag(versao['total'], versao['sequencia'], request.query_string.decode())
+    if nao_modificado(request, etag):
+        return aplicar_validadores(Response('', status=304), etag)
+    
+    resultado = await cliente_controller_async.listar_clientes(
+        limite=request.args.get('limit'),
+        cursor=request.args.get('cursor'),
+        campos=ler_campos(request),
+        ordenacao=request.args.get('sort', 'id')
+    )
+    if not resultado['success']:
+        return jsonify(resultado), 400
+    return aplicar_validadores(jsonify(resultado), etag)
+
+@cliente_bp_async.route('/batch-get', methods=['POST'])
+async def buscar_clientes_lote():
+    dados = await request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return jsonify({'success': False, 'message': 'Envie um objeto JSON com ids, emails ou cpfs!'}), 400
+    
+    resultado = await cliente_controller_async.buscar_clientes_lote(
+        ids=dados.get('ids'),
+        emails=dados.get('emails'),
+        cpfs=dados.get('cpfs'),
+        campos=dados.get('fields')
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp_async.route('/changes', methods=['GET'])
+async def listar_alteracoes():
+    resultado = await cliente_controller_async.listar_alteracoes(
+        cursor=request.args.get('since'),
+        limite=request.args.get('limit'),
+        campos=ler_campos(request)
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp_async.route('/search', methods=['GET'])
+async def buscar_por_nome():
+    resultado = await cliente_controller_async.buscar_por_nome(
+        request.args.get('q', ''),
+        limite=request.args.get('limit'),
+        offset=request.args.get('offset', 0),
+        campos=ler_campos(request)
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp_async.route('/stats', methods=['GET'])
+async def estatisticas_cadastros():
+    agrupamentos = {'day': 'dia', 'month': 'mes'}
+    resultado = await cliente_controller_async.estatisticas_cadastros(
+        data_inicio=request.args.get('start'),
+        data_fim=request.args.get('end'),
+        agrupamento=agrupamentos.get(request.args.get('group', 'day'), request.args.get('group'))
+    )
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp_async.route('/cache/stats', methods=['GET'])
+async def estatisticas_cache():
+    return jsonify(await cliente_controller_async.estatisticas_cache()), 200
+
+async def _resposta_busca(resultado):
+    """200 com validadores, 304 se o cliente do requisitante ainda vale, ou 404"""
+    if not (resultado['success'] and resultado['cliente']):
+        return jsonify({'success': False, 'message': 'Cliente não encontrado!'}), 404
+    
+    cliente = resultado['cliente']
+    etag, ultima_modificacao = validadores_cliente(cliente['id'], cliente['versao'], cliente['data_atualizacao'])
+    if nao_modificado(request, etag, ultima_modificacao):
+        return aplicar_validadores(Response('', status=304), etag, ultima_modificacao)
+    return aplicar_validadores(jsonify(resultado), etag, ultima_modificacao)
+
+@cliente_bp_async.route('/<int:id>', methods=['GET'])
+async def buscar_cliente(id):
+    # Revalidação: compara só versão e data de atualização, sem carregar o cliente
+    if request.if_none_match or request.if_modified_since:
+        validador = await cliente_controller_async.validador_cliente(id)
+        if validador:
+            etag, ultima_modificacao = validadores_cliente(id, validador['versao'], validador['data_atualizacao'])
+            if nao_modificado(request, etag, ultima_modificacao):
+                return aplicar_validadores(Response('', status=304), etag, ultima_modificacao)
+    
+    return await _resposta_busca(await cliente_controller_async.buscar_cliente(id=id))
+
+@cliente_bp_async.route('/by-cpf/<cpf>', methods=['GET'])
+async def buscar_cliente_por_cpf(cpf):
+    return await _resposta_busca(await cliente_controller_async.buscar_cliente(cpf=cpf))
+
+@cliente_bp_async.route('/by-email/<email>', methods=['GET'])
+async def buscar_cliente_por_email(email):
+    return await _resposta_busca(await cliente_controller_async.buscar_cliente(email=email))
+
+@cliente_bp_async.route('/<int:id>', methods=['PUT'])
+async def atualizar_cliente(id):
+    try:
+        # Cria DTO de atualização
+        dados = await request.get_json() if request.is_json else (await request.form).to_dict()
+        atualizar_dto = AtualizarClienteDTO(dados)
+        erros = atualizar_dto.erros()
+        if erros:
+            return resposta_invalida(erros)
+        
+        resultado = await cliente_controller_async.atualizar_cliente(id, atualizar_dto.to_dict())
+        return jsonify(resultado), 200 if resultado['success'] else 400
+    except ServicoSaturadoError:
+        raise
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@cliente_bp_async.route('/<int:id>', methods=['PATCH'])
+async def atualizar_parcial(id):
+    dados = await request.get_json(silent=True)
+    if not isinstance(dados, dict):
+        return jsonify({'success': False, 'message': 'Envie um objeto JSON!'}), 400
+    
+    # A versão pode vir no corpo ou no cabeçalho If-Match
+    versao = dados.get('versao', versao_if_match(request))
+    atualizar_dto = AtualizarClienteDTO(dados)
+    erros = atualizar_dto.erros()
+    if erros:
+        return resposta_invalida(erros)
+    resultado = await cliente_controller_async.atualizar_parcial(id, versao, atualizar_dto.to_dict())
+    if resultado['success']:
+        return jsonify(resultado), 200
+    return jsonify(resultado), STATUS_FALHA_ATUALIZACAO.get(resultado.get('motivo'), 400)
+
+@cliente_bp_async.route('', methods=['PATCH'])
+async def atualizar_parcial_lote():
+    itens = await request.get_json(silent=True)
+    if not isinstance(itens, list):
+        return jsonify({'success': False, 'message': 'Envie uma lista de {id, versao, campos...}!'}), 400
+    
+    resultado = await cliente_controller_async.atualizar_parcial_lote(itens)
+    return jsonify(resultado), 200 if resultado['success'] else 400
+
+@cliente_bp_async.route('/<int:id>', methods=['DELETE'])
+async def deletar_cliente(id):
+    resultado = await cliente_controller_async.deletar_cliente(id)
+    return jsonify(resultado), 200 if resultado['success'] else 404
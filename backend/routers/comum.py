@@ -0,0 +1,66 @@
+# routers/comum.py
+# Auxiliares HTTP compartilhados pelas rotas síncronas (Flask) e assíncronas (Quart):
+# recebem o request do framework, e os ETags saem iguais nos dois apps
+from datetime import datetime, timezone
+import hashlib
+
+STATUS_FALHA_ATUALIZACAO = {'conflito': 409, 'nao_encontrado': 404}
+
+
+def ler_campos(request):
+    """Lê a projeção do parâmetro ?fields=a,b,c (None se ausente)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [campo.strip() for campo in fields.split(',') if campo.strip()]
+
+
+def resposta_invalida(erros):
+    """400 com a primeira mensagem e todos os erros por campo"""
+    return {
+        'success': False,
+        'message': next(iter(erros.values())),
+        'erros': erros
+    }, 400
+
+
+def gerar_etag(*partes):
+    """ETag opaco a partir dos valores que identificam a versão do recurso"""
+    return hashlib.sha1('|'.join(str(parte) for parte in partes).encode()).hexdigest()[:20]
+
+
+def validadores_cliente(id, versao, data_atualizacao):
+    """
+    ETag e Last-Modified de um cliente (data_atualizacao está no horário local do servidor)
+    O ETag começa pela versão ("<versao>.<hash>"), para que o PATCH a leia do If-Match.
+    """
+    ultima_modificacao = None
+    if data_atualizacao:
+        ultima_modificacao = datetime.fromisoformat(data_atualizacao).astimezone(timezone.utc)
+    return f'{versao}.{gerar_etag(id, versao, data_atualizacao)}', ultima_modificacao
+
+
+def versao_if_match(request):
+    """Versão enviada em If-Match: o ETag de um GET (fraco ou não) ou a versão pura"""
+    for etag in request.if_match.as_set(include_weak=True):
+        return etag.split('.', 1)[0]
+    return None
+
+
+def nao_modificado(request, etag, ultima_modificacao=None):
+    """Avalia If-None-Match (que tem precedência) e If-Modified-Since, sem montar o corpo"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if ultima_modificacao and request.if_modified_since:
+        return ultima_modificacao <= request.if_modified_since
+    return False
+
+
+def aplicar_validadores(resposta, etag, ultima_modificacao=None):
+    """ETag fraco (o corpo pode ir comprimido) e revalidação obrigatória a cada uso"""
+    resposta.set_etag(etag, weak=True)
+    if ultima_modificacao:
+        resposta.last_modified = ultima_modificacao
+    resposta.cache_control.private = True
+    resposta.cache_control.no_cache = True
+    return resposta
@@ -0,0 +1,9 @@
+# routers/metrics_router.py
+from flask import Blueprint, Response
+from services.metrics_service import metricas
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    return Response(metricas.exportar(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,10 @@
+# services/__init__.py
+from .hash_service import ServicoHash, ServicoSaturadoError, servico_hash
+from .cache_service import Cache, CacheLRU, cache_clientes
+from .metrics_service import Metricas, metricas
+
+__all__ = [
+    'ServicoHash', 'ServicoSaturadoError', 'servico_hash',
+    'Cache', 'CacheLRU', 'cache_clientes',
+    'Metricas', 'metricas'
+]
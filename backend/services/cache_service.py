@@ -0,0 +1,91 @@
+# services/cache_service.py
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Cache(ABC):
+    """
+    Interface mínima de cache chave/valor.
+    Espelha GET/SET com EX/DEL do Redis, para que um backend compatível
+    possa substituir o cache em memória sem mudar o controller.
+    """
+    
+    @abstractmethod
+    def get(self, chave):
+        """Retorna o valor ou None se ausente/expirado"""
+    
+    @abstractmethod
+    def set(self, chave, valor, ttl=None):
+        """Armazena o valor; ttl em segundos (None usa o padrão do cache)"""
+    
+    @abstractmethod
+    def delete(self, *chaves):
+        """Remove as chaves informadas"""
+    
+    @abstractmethod
+    def stats(self):
+        """Retorna os contadores do cache"""
+
+
+class CacheLRU(Cache):
+    """Cache em memória do processo, com TTL e tamanho máximo (remove o menos usado)"""
+    
+    def __init__(self, tamanho_maximo=None, ttl=None):
+        self.tamanho_maximo = tamanho_maximo or int(os.getenv('CACHE_TAMANHO', 10000))
+        self.ttl = ttl if ttl is not None else float(os.getenv('CACHE_TTL', 60))
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+            
+            valor, expira_em = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                self.misses += 1
+                return None
+            
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+    
+    def set(self, chave, valor, ttl=None):
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, *chaves):
+        with self._lock:
+            for chave in chaves:
+                self._dados.pop(chave, None)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'tamanho': len(self._dados),
+                'tamanho_maximo': self.tamanho_maximo,
+                'ttl': self.ttl
+            }
+
+
+cache_clientes = CacheLRU()
@@ -0,0 +1,67 @@
+# services/compression_service.py
+import gzip
+import os
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:  # br é opcional (pip install brotli); sem ele, só gzip
+    brotli = None
+
+load_dotenv()
+
+# Respostas menores que isso (bytes) não compensam o custo de comprimir
+TAMANHO_MINIMO = int(os.getenv('COMPRESSAO_MINIMO', 1024))
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5
+
+TIPOS_COMPRIMIVEIS = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript'
+}
+
+
+def codificacoes_suportadas():
+    """Codificações disponíveis, na ordem de preferência do servidor"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def comprimir(corpo, codificacao):
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=QUALIDADE_BROTLI)
+    return gzip.compress(corpo, compresslevel=NIVEL_GZIP)
+
+
+def comprimir_resposta(resposta, aceitas, tamanho_minimo=TAMANHO_MINIMO):
+    """
+    Comprime a resposta em br ou gzip quando o cliente aceita e vale a pena
+    Args:
+        resposta: Response já montada (com corpo em memória)
+        aceitas: request.accept_encodings do cliente
+        tamanho_minimo: bytes a partir dos quais a resposta é comprimida
+    Respostas em streaming, já codificadas ou sem corpo passam intactas.
+    """
+    if (resposta.status_code < 200 or resposta.status_code in (204, 206, 304)
+            or resposta.direct_passthrough or resposta.is_streamed
+            or 'Content-Encoding' in resposta.headers
+            or resposta.mimetype not in TIPOS_COMPRIMIVEIS):
+        return resposta
+
+    # Mesmo sem comprimir agora, a representação depende do Accept-Encoding
+    resposta.vary.add('Accept-Encoding')
+
+    codificacao = aceitas.best_match(codificacoes_suportadas())
+    if codificacao is None:
+        return resposta
+
+    corpo = resposta.get_data()
+    if len(corpo) < tamanho_minimo:
+        return resposta
+
+    resposta.set_data(comprimir(corpo, codificacao))
+    resposta.headers['Content-Encoding'] = codificacao
+    # Outra codificação é outra representação: um ETag forte deixa de valer byte a byte
+    etag, fraco = resposta.get_etag()
+    if etag and not fraco:
+        resposta.set_etag(etag, weak=True)
+    return resposta
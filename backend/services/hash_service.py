@@ -0,0 +1,153 @@
+# services/hash_service.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from dotenv import load_dotenv
+from services.metrics_service import registrar_bcrypt
+
+load_dotenv()
+
+
+class ServicoSaturadoError(Exception):
+    """Fila de hashing cheia; o cliente deve tentar novamente mais tarde"""
+    
+    def __init__(self, retry_after):
+        super().__init__('Serviço ocupado, tente novamente em instantes!')
+        self.retry_after = retry_after
+
+
+class ServicoHash:
+    """
+    Executa o bcrypt em um pool limitado de threads.
+    O bcrypt libera o GIL durante o cálculo, então threads ocupam todos os núcleos
+    sem o custo de serializar senhas entre processos. O número de hashes em execução
+    ou aguardando é limitado; acima disso a requisição é recusada em vez de enfileirada,
+    para que rajadas de cadastro não consumam os workers das rotas de leitura.
+    """
+    
+    def __init__(self, workers=None, limite_fila=None, custo=None, timeout=None):
+        self.workers = workers or int(os.getenv('HASH_WORKERS', os.cpu_count() or 1))
+        self.limite_fila = limite_fila or int(os.getenv('HASH_FILA', self.workers * 4))
+        self.custo = custo or int(os.getenv('BCRYPT_ROUNDS', 12))
+        self.timeout = timeout or float(os.getenv('HASH_TIMEOUT', 30))
+        self._vagas = threading.BoundedSemaphore(self.workers + self.limite_fila)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._segundos_por_hash = None
+    
+    def _get_executor(self):
+        """Cria o pool na primeira utilização"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='bcrypt'
+                )
+            return self._executor
+    
+    def _retry_after(self):
+        """Estimativa, em segundos, para a fila esvaziar"""
+        segundos = self._segundos_por_hash or 0.25
+        return max(1, int(segundos * (self.workers + self.limite_fila) / self.workers + 0.5))
+    
+    def _admitir(self, bloqueante=False):
+        if bloqueante:
+            admitido = self._vagas.acquire(timeout=self.timeout)
+        else:
+            admitido = self._vagas.acquire(blocking=False)
+        if not admitido:
+            raise ServicoSaturadoError(self._retry_after())
+    
+    def _calcular(self, senha):
+        try:
+            return bcrypt.hashpw(
+                senha.encode('utf-8'),
+                bcrypt.gensalt(rounds=self.custo)
+            ).decode('utf-8')
+        finally:
+            self._vagas.release()
+    
+    def _submeter(self, senha):
+        """Admite (ou recusa, sem esperar) e envia o hash ao pool; retorna o Future"""
+        self._admitir()
+        try:
+            return self._get_executor().submit(self._calcular, senha)
+        except Exception:
+            self._vagas.release()
+            raise
+    
+    def gerar_hash(self, senha):
+        """Gera o hash de uma senha; levanta ServicoSaturadoError se a fila estiver cheia"""
+        inicio = time.perf_counter()
+        resultado = self._submeter(senha).result()
+        registrar_bcrypt(time.perf_counter() - inicio)
+        return resultado
+    
+    async def gerar_hash_async(self, senha):
+        """
+        gerar_hash para o event loop: a admissão acontece na thread do loop (a 503 vale
+        também no modo assíncrono) e o hash é aguardado sem bloqueá-lo
+        """
+        inicio = time.perf_counter()
+        resultado = await asyncio.wrap_future(self._submeter(senha))
+        registrar_bcrypt(time.perf_counter() - inicio)
+        return resultado
+    
+    def gerar_hashes(self, senhas):
+        """
+        Gera os hashes de várias senhas em paralelo, preservando a ordem.
+        Usado em cargas em lote: aguarda vaga (até timeout) em vez de recusar.
+        """
+        executor = self._get_executor()
+        inicio = time.perf_counter()
+        futuros = []
+        for senha in senhas:
+            self._admitir(bloqueante=True)
+            try:
+                futuros.append(executor.submit(self._calcular, senha))
+            except Exception:
+                self._vagas.release()
+                raise
+        resultados = [futuro.result() for futuro in futuros]
+        registrar_bcrypt(time.perf_counter() - inicio)
+        return resultados
+    
+    def calibrar(self, amostras=5):
+        """Mede o custo do bcrypt neste host e retorna hashes/s por núcleo"""
+        bcrypt.hashpw(b'aquecimento', bcrypt.gensalt(rounds=self.custo))
+        inicio = time.perf_counter()
+        for _ in range(amostras):
+            bcrypt.hashpw(b'calibracao', bcrypt.gensalt(rounds=self.custo))
+        self._segundos_por_hash = (time.perf_counter() - inicio) / amostras
+        
+        por_nucleo = 1 / self._segundos_por_hash
+        return {
+            'custo': self.custo,
+            'ms_por_hash': round(self._segundos_por_hash * 1000, 1),
+            'hashes_por_segundo_por_nucleo': round(por_nucleo, 2),
+            'workers': self.workers,
+            'hashes_por_segundo_estimado': round(por_nucleo * min(self.workers, os.cpu_count() or 1), 2),
+            'limite_fila': self.limite_fila
+        }
+    
+    def reiniciar_apos_fork(self):
+        """No processo filho, as threads do pool do pai não existem: recria o estado"""
+        self._vagas = threading.BoundedSemaphore(self.workers + self.limite_fila)
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def encerrar(self):
+        """Finaliza o pool aguardando os hashes em andamento"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+servico_hash = ServicoHash()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=servico_hash.reiniciar_apos_fork)
@@ -0,0 +1,303 @@
+# services/metrics_service.py
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Limites (em segundos) dos histogramas de latência
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Intervalo (segundos) entre gravações do instantâneo de cada processo em METRICS_DIR
+INTERVALO_GRAVACAO = 1.0
+
+# Acumuladores da requisição atual (consultas SQL, bcrypt); None fora de requisições
+_requisicao_atual = ContextVar('metricas_requisicao', default=None)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos) + '}'
+
+
+class Metricas:
+    """
+    Registro mínimo de métricas no formato texto do Prometheus (contadores,
+    histogramas e gauges calculados na coleta).
+    Com METRICS_DIR definido (o gunicorn.conf.py define), cada processo grava a cada
+    INTERVALO_GRAVACAO segundos um instantâneo em METRICS_DIR/metricas-<pid>.json e
+    exportar() soma os de todos os workers, inclusive os já encerrados, para que
+    contadores e histogramas não pareçam reiniciar a cada scrape. Gauges são por
+    processo: saem com o rótulo pid, só dos workers vivos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._descricoes = {}
+        self._contadores = {}
+        self._histogramas = {}
+        self._gauges = {}
+        self._pid_gravador = None
+
+    def _registrar(self, nome, tipo, descricao):
+        self._descricoes.setdefault(nome, (tipo, descricao))
+
+    def incrementar(self, nome, descricao, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._registrar(nome, 'counter', descricao)
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+        self._garantir_gravador()
+
+    def observar(self, nome, descricao, valor, buckets=BUCKETS_PADRAO, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._registrar(nome, 'histogram', descricao)
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = {
+                    'buckets': buckets, 'contagens': [0] * len(buckets), 'soma': 0.0, 'total': 0
+                }
+            for i, limite in enumerate(histograma['buckets']):
+                if valor <= limite:
+                    histograma['contagens'][i] += 1
+            histograma['soma'] += valor
+            histograma['total'] += 1
+        self._garantir_gravador()
+
+    def gauge(self, nome, descricao, funcao):
+        """Registra um gauge cujo valor é lido por funcao() a cada coleta (None omite)"""
+        with self._lock:
+            self._registrar(nome, 'gauge', descricao)
+            self._gauges[nome] = funcao
+
+    def reiniciar_apos_fork(self):
+        """No worker recém-criado: zera os valores herdados do master (mantém os gauges registrados)"""
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+        self._pid_gravador = None
+
+    def _instantaneo(self):
+        """Estado do processo em estruturas serializáveis em JSON"""
+        with self._lock:
+            descricoes = {nome: list(valor) for nome, valor in self._descricoes.items()}
+            contadores = [[nome, list(map(list, rotulos)), valor]
+                          for (nome, rotulos), valor in self._contadores.items()]
+            histogramas = [[nome, list(map(list, rotulos)), list(h['buckets']), list(h['contagens']), h['soma'], h['total']]
+                           for (nome, rotulos), h in self._histogramas.items()]
+            gauges = dict(self._gauges)
+        valores = []
+        for nome, funcao in gauges.items():
+            valor = funcao()
+            if valor is not None:
+                valores.append([nome, valor])
+        return {'pid': os.getpid(), 'descricoes': descricoes, 'contadores': contadores,
+                'histogramas': histogramas, 'gauges': valores}
+
+    def gravar(self):
+        """Grava o instantâneo do processo em METRICS_DIR (substituição atômica)"""
+        diretorio = os.getenv('METRICS_DIR')
+        if not diretorio:
+            return
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, f'metricas-{os.getpid()}.json')
+        # Temporário próprio de cada chamada: o gravador e os /metrics simultâneos não colidem
+        descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=f'metricas-{os.getpid()}-', suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'w') as arquivo:
+                json.dump(self._instantaneo(), arquivo)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def _garantir_gravador(self):
+        """Inicia, uma vez por processo, a thread que grava o instantâneo periodicamente"""
+        if self._pid_gravador == os.getpid() or not os.getenv('METRICS_DIR'):
+            return
+        with self._lock:
+            if self._pid_gravador == os.getpid():
+                return
+            self._pid_gravador = os.getpid()
+
+        def gravar_periodicamente():
+            while True:
+                time.sleep(INTERVALO_GRAVACAO)
+                try:
+                    self.gravar()
+                except OSError:
+                    pass
+
+        threading.Thread(target=gravar_periodicamente, name='metricas-gravador', daemon=True).start()
+        atexit.register(self.gravar)
+
+    def _instantaneos(self):
+        """Instantâneos de todos os processos (só o deste, sem METRICS_DIR)"""
+        diretorio = os.getenv('METRICS_DIR')
+        if not diretorio:
+            return [self._instantaneo()]
+        self.gravar()
+        instantaneos = []
+        for caminho in glob.glob(os.path.join(diretorio, 'metricas-*.json')):
+            try:
+                with open(caminho) as arquivo:
+                    instantaneos.append(json.load(arquivo))
+            except (OSError, ValueError):
+                continue
+        return instantaneos
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)"""
+        instantaneos = self._instantaneos()
+        varios = len(instantaneos) > 1 or bool(os.getenv('METRICS_DIR'))
+
+        descricoes = {}
+        contadores = {}
+        histogramas = {}
+        gauges = {}
+        for instantaneo in instantaneos:
+            for nome, (tipo, descricao) in instantaneo['descricoes'].items():
+                descricoes.setdefault(nome, (tipo, descricao))
+            for nome, rotulos, valor in instantaneo['contadores']:
+                chave = (nome, tuple(map(tuple, rotulos)))
+                contadores[chave] = contadores.get(chave, 0) + valor
+            for nome, rotulos, buckets, contagens, soma, total in instantaneo['histogramas']:
+                chave = (nome, tuple(map(tuple, rotulos)))
+                h = histogramas.setdefault(chave, {'buckets': buckets, 'contagens': [0] * len(buckets),
+                                                   'soma': 0.0, 'total': 0})
+                h['contagens'] = [a + b for a, b in zip(h['contagens'], contagens)]
+                h['soma'] += soma
+                h['total'] += total
+            # Gauges descrevem o processo agora: workers encerrados não entram
+            if varios and not _processo_vivo(instantaneo['pid']):
+                continue
+            for nome, valor in instantaneo['gauges']:
+                rotulos = (('pid', instantaneo['pid']),) if varios else ()
+                gauges.setdefault(nome, []).append((rotulos, valor))
+
+        linhas = []
+        for nome, (tipo, descricao) in sorted(descricoes.items()):
+            linhas.append(f'# HELP {nome} {descricao}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            if tipo == 'counter':
+                for (n, rotulos), valor in sorted(contadores.items()):
+                    if n == nome:
+                        linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {valor}')
+            elif tipo == 'histogram':
+                for (n, rotulos), h in sorted(histogramas.items(), key=lambda item: item[0]):
+                    if n != nome:
+                        continue
+                    for limite, contagem in zip(h['buckets'], h['contagens']):
+                        linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos + (("le", limite),))} {contagem}')
+                    linhas.append(f'{nome}_bucket{_formatar_rotulos(rotulos + (("le", "+Inf"),))} {h["total"]}')
+                    linhas.append(f'{nome}_sum{_formatar_rotulos(rotulos)} {h["soma"]}')
+                    linhas.append(f'{nome}_count{_formatar_rotulos(rotulos)} {h["total"]}')
+            else:
+                for rotulos, valor in sorted(gauges.get(nome, [])):
+                    linhas.append(f'{nome}{_formatar_rotulos(rotulos)} {valor}')
+        return '\n'.join(linhas) + '\n'
+
+
+def _processo_vivo(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+metricas = Metricas()
+
+
+def iniciar_requisicao():
+    """Abre os acumuladores da requisição atual"""
+    contexto = {'inicio': time.perf_counter(), 'sql_total': 0, 'sql_segundos': 0.0, 'bcrypt_segundos': 0.0}
+    _requisicao_atual.set(contexto)
+    return contexto
+
+
+def finalizar_requisicao():
+    """Fecha e retorna os acumuladores da requisição atual"""
+    contexto = _requisicao_atual.get()
+    _requisicao_atual.set(None)
+    return contexto
+
+
+def registrar_bcrypt(segundos):
+    """Tempo de espera + cálculo do bcrypt visto pela requisição"""
+    contexto = _requisicao_atual.get()
+    if contexto is not None:
+        contexto['bcrypt_segundos'] += segundos
+    metricas.observar('bcrypt_seconds', 'Tempo para obter um hash bcrypt (fila + cálculo)', segundos)
+
+
+def classe_pool_instrumentada(classe_pool, pool='primario'):
+    """
+    Subclasse do pool que mede a espera no checkout de conexões, com o rótulo pool
+    (primario ou replica-N). Como recreate() instancia self.__class__, a medição
+    sobrevive a dispose().
+    """
+    class PoolInstrumentado(classe_pool):
+        def connect(self):
+            inicio = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                metricas.observar(
+                    'db_pool_checkout_wait_seconds',
+                    'Espera para obter uma conexão do pool',
+                    time.perf_counter() - inicio,
+                    pool=pool
+                )
+
+    PoolInstrumentado.__name__ = f'{classe_pool.__name__}Instrumentado'
+    return PoolInstrumentado
+
+
+def instrumentar_engine(engine, gauges=True, pool='primario'):
+    """
+    Conta e cronometra as consultas SQL do engine, por requisição e no total
+    gauges: publica também a ocupação do pool (só um engine, o primário, por processo)
+    pool: rótulo do engine na duração das consultas (primario ou replica-N)
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        segundos = time.perf_counter() - conn.info['metricas_inicio'].pop()
+        contexto = _requisicao_atual.get()
+        if contexto is not None:
+            contexto['sql_total'] += 1
+            contexto['sql_segundos'] += segundos
+        metricas.observar('db_query_seconds', 'Duração das consultas SQL', segundos, pool=pool)
+
+    def _utilizacao():
+        pool = engine.pool
+        if not hasattr(pool, 'size'):
+            return None
+        capacidade = pool.size() + max(getattr(pool, '_max_overflow', 0), 0)
+        return round(pool.checkedout() / capacidade, 4) if capacidade else None
+
+    if not gauges:
+        return engine
+    metricas.gauge('db_pool_checked_out', 'Conexões em uso no pool',
+                   lambda: engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else None)
+    metricas.gauge('db_pool_utilization', 'Fração da capacidade do pool em uso (0 a 1)', _utilizacao)
+    return engine
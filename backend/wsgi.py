@@ -0,0 +1,8 @@
+"""
+Ponto de entrada WSGI de produção.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import create_app
+
+app = create_app()